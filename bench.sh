@@ -0,0 +1 @@
+python3 -m benchmarks run --compare benchmarks/baseline.json "$@"
\ No newline at end of file
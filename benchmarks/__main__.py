@@ -0,0 +1,93 @@
+"""
+    usage:
+        python3 -m benchmarks run [--quick] [--output results.json] [--compare baseline.json] [--threshold 0.15]
+        python3 -m benchmarks compare baseline.json results.json [--threshold 0.15]
+"""
+import argparse
+import json
+import platform
+import sys
+
+import benchmarks  # puts src/ on sys.path
+from benchmarks.micro import run_all
+
+# bump this whenever the layout of the results file changes
+RESULTS_VERSION = 1
+
+def load_results(path: str) -> dict:
+    with open(path, 'r') as file:
+        data = json.load(file)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Results file [{path}] has version {data.get('version')}, expected {RESULTS_VERSION}")
+    return data
+
+def save_results(path: str, results: dict) -> None:
+    data = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+        Prints a table of current vs baseline times and returns the names of the benchmarks that got
+        slower by more than threshold (0.15 = 15%).
+    """
+    regressions = []
+    print(f"{'benchmark':<26} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            print(f"{name:<26} {'(only in ' + ('current' if name in current else 'baseline') + ')':>34}")
+            continue
+
+        change = current[name] / baseline[name] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<26} {baseline[name] * 1000:>10.3f}ms {current[name] * 1000:>10.3f}ms {change:>+8.1%}{flag}")
+    return regressions
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks", description="Benchmarks for the static site generator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--quick", action="store_true", help="fewer rounds on a smaller corpus")
+    run_parser.add_argument("--output", help="write the results to this JSON file")
+    run_parser.add_argument("--compare", metavar="BASELINE", help="compare the results against a stored baseline")
+    run_parser.add_argument("--threshold", type=float, default=0.15, help="slowdown that counts as a regression (default: 0.15)")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two stored results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="slowdown that counts as a regression (default: 0.15)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        current = load_results(args.current)["results"]
+        baseline = load_results(args.baseline)["results"]
+    else:
+        current = run_all(quick=args.quick)
+        if args.output:
+            save_results(args.output, current)
+        if not args.compare:
+            for name, seconds in sorted(current.items()):
+                print(f"{name:<26} {seconds * 1000:>10.3f}ms")
+            return 0
+        baseline = load_results(args.compare)["results"]
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
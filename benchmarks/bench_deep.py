@@ -0,0 +1,114 @@
+"""
+    Stress benchmark for deep trees: rendering a chain of nested ParentNodes 10k deep, and walking a
+    chain of nested directories, with the explicit-stack versions against the recursive ones they
+    replaced (kept here for comparison), which give up at the recursion limit. A flat corpus page and a
+    broad directory tree check that the common case didn't get slower.
+
+    The directory chain is as deep as the platform's path length limit allows (about 2k levels with
+    one-letter names under a 4096 byte PATH_MAX), since every path in it has to stay openable.
+
+    usage: python3 -m benchmarks.bench_deep [depth]
+"""
+import os
+import random
+import sys
+import tempfile
+
+import benchmarks  # puts src/ on sys.path
+from benchmarks.corpus import page
+from benchmarks.micro import best_time
+from copy_static_content import list_files, remove_tree
+from htmlnode import LeafNode, ParentNode
+from textnode_helpers import markdown_to_html_node
+
+def recursive_render(node, write) -> None:
+    # the original ParentNode.render: one Python frame per level of nesting
+    if not isinstance(node, ParentNode):
+        node.render(write)
+        return
+    node._validate()
+    write(f"<{node.tag}{node.props_to_html()}>")
+    for child in node.children:
+        recursive_render(child, write)
+    write(f"</{node.tag}>")
+
+def recursive_list_files(root: str, rel_dir: str = "") -> list:
+    # the original list_files
+    files = []
+    with os.scandir(os.path.join(root, rel_dir)) as entries:
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            if entry.is_dir():
+                files.extend(recursive_list_files(root, rel_path))
+            else:
+                files.append(rel_path)
+    return files
+
+def nested_nodes(depth: int) -> ParentNode:
+    node = LeafNode("b", "bottom")
+    for level in range(depth):
+        node = ParentNode("div", [LeafNode(None, f"{level} "), node])
+    return node
+
+def make_chain(root: str, depth: int) -> None:
+    # one directory per level, with a file in each
+    path = root
+    for _ in range(depth):
+        path = os.path.join(path, "d")
+        os.mkdir(path)
+        with open(os.path.join(path, "f"), 'w') as file:
+            file.write("x")
+
+def make_broad(root: str, dirs: int = 200, files: int = 20) -> None:
+    for dir_index in range(dirs):
+        dir_path = os.path.join(root, f"section{dir_index % 10}", f"dir{dir_index}")
+        os.makedirs(dir_path)
+        for file_index in range(files):
+            with open(os.path.join(dir_path, f"file{file_index}.txt"), 'w') as file:
+                file.write("x")
+
+def timed(function) -> str:
+    try:
+        return f"{best_time(function, repeat=5) * 1000:>9.2f}ms"
+    except RecursionError:
+        return f"{'RecursionError':>11}"
+
+def to_html(node, render) -> str:
+    chunks = []
+    render(node, chunks.append)
+    return "".join(chunks)
+
+def compare(name: str, recursive, iterative) -> None:
+    print(f"{name:<28} {timed(recursive)} {timed(iterative)}")
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"{'':<28} {'recursive':>11} {'iterative':>11}")
+
+    deep_node = nested_nodes(depth)
+    compare(f"render, {depth} deep", lambda: to_html(deep_node, recursive_render), deep_node.to_html)
+    page_node = markdown_to_html_node(page(random.Random(0), 0, blocks=200))
+    if to_html(page_node, recursive_render) != page_node.to_html():
+        raise AssertionError("renderers disagree")
+    compare("render, 200 block page", lambda: to_html(page_node, recursive_render), page_node.to_html)
+
+    # TemporaryDirectory cleans up with shutil.rmtree, which can't get through the chain
+    root = tempfile.mkdtemp()
+    try:
+        chain_root = os.path.join(root, "chain")
+        os.mkdir(chain_root)
+        chain_depth = min(depth, (os.pathconf(root, "PC_PATH_MAX") - len(chain_root) - 8) // 2)
+        make_chain(chain_root, chain_depth)
+        compare(f"list_files, {chain_depth} deep", lambda: recursive_list_files(chain_root), lambda: list_files(chain_root))
+
+        broad_root = os.path.join(root, "broad")
+        make_broad(broad_root)
+        if recursive_list_files(broad_root) != list_files(broad_root):
+            raise AssertionError("walkers disagree")
+        compare("list_files, 4000 files", lambda: recursive_list_files(broad_root), lambda: list_files(broad_root))
+    finally:
+        remove_tree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+    Measures what html escaping adds to rendering the corpus, against the unescaped LeafNode and
+    HTMLNode.props_to_html it replaced: for to_html alone, and for markdown -> html as a whole. Leaves
+    escape their value the first time they are rendered and keep the result, so a second to_html of the
+    same tree mostly measures the check that the cached escape is still current.
+
+    usage: python3 -m benchmarks.bench_escaping [pages]
+"""
+import contextlib
+import random
+import sys
+from unittest import mock
+
+import benchmarks  # puts src/ on sys.path
+from benchmarks.corpus import page
+from benchmarks.micro import best_time
+from htmlnode import HTMLNode, LeafNode
+from textnode_helpers import markdown_to_html_node
+
+def unescaped_leaf_html(self) -> str:
+    if self.value == None:
+        raise ValueError("Value cannot be None.")
+    if self.tag is None:
+        return self.value
+    return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+def unescaped_props_to_html(self) -> str:
+    if self.props == None:
+        return ""
+    return "".join([f' {k}="{v}"' for k, v in self.props.items()])
+
+@contextlib.contextmanager
+def unescaped():
+    with mock.patch.object(LeafNode, "_leaf_html", unescaped_leaf_html), mock.patch.object(HTMLNode, "props_to_html", unescaped_props_to_html), \
+            mock.patch.object(LeafNode, "props_to_html", unescaped_props_to_html):
+        yield
+
+def interleaved_best(function, rounds: int = 15) -> tuple:
+    """
+        Best time of function with and without escaping. The two alternate round by round, so drift
+        in machine load hits both alike.
+    """
+    escaped, plain = [], []
+    for _ in range(rounds):
+        escaped.append(best_time(function, repeat=1, min_round=0.05))
+        with unescaped():
+            plain.append(best_time(function, repeat=1, min_round=0.05))
+    return min(plain), min(escaped)
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rng = random.Random(0)
+    documents = [page(rng, index) for index in range(pages)]
+
+    html_nodes = [markdown_to_html_node(document) for document in documents]
+
+    def render():
+        for html_node in html_nodes:
+            html_node.to_html()
+
+    def convert():
+        for document in documents:
+            markdown_to_html_node(document).to_html()
+
+    print(f"{pages} pages, best of 15 interleaved rounds")
+    print(f"{'':<18} {'unescaped':>10} {'escaped':>10} {'change':>8}")
+    for name, function in (("to_html", render), ("markdown -> html", convert)):
+        before, after = interleaved_best(function)
+        print(f"{name:<18} {before * 1000:>8.2f}ms {after * 1000:>8.2f}ms {(after / before - 1) * 100:>+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
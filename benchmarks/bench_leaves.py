@@ -0,0 +1,89 @@
+"""
+    Benchmark for text_node_to_html_node on a link-heavy index page: the original match-based version
+    (kept here for comparison) against the factory table, with and without interning. Times cover
+    building the leaves, and building plus rendering them. Without interning the table builds and
+    renders about as fast as the match; the gain comes from sharing leaves, which is opt-in.
+
+    usage: python3 -m benchmarks.bench_leaves [entries] [distinct_links]
+"""
+import random
+import sys
+
+import benchmarks  # puts src/ on sys.path
+from benchmarks.corpus import WORDS
+from benchmarks.micro import best_time
+from htmlnode import LeafNode
+from textnode import TextNode, TextType, resolve_url, text_node_to_html_node
+
+def legacy_text_node_to_html_node(text_node: TextNode, basepath: str = "/", assets: dict = None):
+    # the original implementation: a match on the text type and a fresh props dict per link and image
+    if not isinstance(text_node, TextNode):
+        raise TypeError(f"Input parameter must be of type TextNode. Received {type(text_node)}")
+
+    match text_node.text_type:
+        case TextType.TEXT:
+            return LeafNode(None, text_node.text, None)
+        case TextType.BOLD:
+            return LeafNode("b", text_node.text, None)
+        case TextType.ITALIC:
+            return LeafNode("i", text_node.text, None)
+        case TextType.CODE:
+            return LeafNode("code", text_node.text, None)
+        case TextType.LINK:
+            return LeafNode("a", text_node.text, {"href": resolve_url(text_node.url, basepath, assets)})
+        case TextType.IMAGE:
+            properties = {"src": resolve_url(text_node.url, basepath, assets), "alt": text_node.text}
+            return LeafNode("img", "", properties)
+        case _:
+            raise ValueError(f"Input text_type [{text_node.text_type}] not supported.")
+
+def index_nodes(entries: int, distinct_links: int) -> list:
+    """
+        The text nodes of an index page: one link per entry, drawn from distinct_links targets, with a
+        bit of text and an occasional bold word between them.
+    """
+    rng = random.Random(0)
+    targets = [(f"{rng.choice(WORDS)} {rng.choice(WORDS)}", f"/blog/post-{index}") for index in range(distinct_links)]
+    nodes = []
+    for _ in range(entries):
+        text, url = rng.choice(targets)
+        nodes.append(TextNode(text, TextType.LINK, url))
+        nodes.append(TextNode(" - ", TextType.TEXT))
+        if rng.random() < 0.2:
+            nodes.append(TextNode(rng.choice(WORDS), TextType.BOLD))
+        nodes.append(TextNode(f" {rng.choice(WORDS)} {rng.choice(WORDS)} ", TextType.TEXT))
+    return nodes
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    distinct_links = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rounds = 10
+    nodes = index_nodes(entries, distinct_links)
+
+    variants = (
+        ("match", lambda node: legacy_text_node_to_html_node(node, "/site/")),
+        ("table", lambda node: text_node_to_html_node(node, "/site/")),
+        ("table, interned", lambda node: text_node_to_html_node(node, "/site/", interned=True)),
+    )
+    expected = "".join(legacy_text_node_to_html_node(node, "/site/").to_html() for node in nodes)
+
+    for name, convert in variants:
+        if "".join(convert(node).to_html() for node in nodes) != expected:
+            raise AssertionError(f"{name} renders different html")
+
+    # the variants take turns round by round, so drift in machine load hits them all alike
+    timings = {name: ([], []) for name, _ in variants}
+    for _ in range(rounds):
+        for name, convert in variants:
+            build, render = timings[name]
+            build.append(best_time(lambda: [convert(node) for node in nodes], repeat=1))
+            render.append(best_time(lambda: [convert(node).to_html() for node in nodes], repeat=1))
+
+    print(f"{len(nodes)} text nodes, {entries} links to {distinct_links} targets, best of {rounds} interleaved rounds")
+    print(f"{'':<16} {'build':>9} {'build+render':>13}")
+    for name, (build, render) in timings.items():
+        print(f"{name:<16} {min(build) * 1000:>7.2f}ms {min(render) * 1000:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+    Adversarial benchmark for split_nodes_link / split_nodes_image, and for the reference extraction
+    (dependency_graph.local_references) every page goes through: a single paragraph holding tens of
+    thousands of distinct links. Doubling the link count should roughly double the time; the legacy
+    split-based version (kept here for comparison) quadruples it.
+
+    usage: python3 -m benchmarks.bench_links [max_links] [legacy_max_links]
+"""
+import gc
+import sys
+import time
+
+import benchmarks  # puts src/ on sys.path
+from dependency_graph import local_references
+from textnode import TextNode, TextType
+from textnode_helpers import extract_markdown_links, split_nodes_image, split_nodes_link
+
+def legacy_split_nodes_link(old_nodes: list) -> list:
+    # the original implementation: rebuilds each link and splits the remaining text once per match
+    nodes_list = []
+    for node in old_nodes:
+        links = extract_markdown_links(node.text)
+        if len(links) == 0:
+            nodes_list.append(node)
+            continue
+        remaining_text = node.text
+        for link_text, link_url in links:
+            sections = remaining_text.split(f"[{link_text}]({link_url})", 1)
+            if sections[0].strip():
+                nodes_list.append(TextNode(sections[0], TextType.TEXT))
+            nodes_list.append(TextNode(link_text, TextType.LINK, link_url))
+            remaining_text = sections[1]
+        if remaining_text and not remaining_text.isspace():
+            nodes_list.append(TextNode(remaining_text, TextType.TEXT))
+    return nodes_list
+
+def link_paragraph(links: int) -> str:
+    return " ".join(f"see [post number {index}](/blog/post-{index}) and" for index in range(links))
+
+def image_paragraph(images: int) -> str:
+    return " ".join(f"![figure {index}](/images/figure-{index}.png) caption" for index in range(images))
+
+def time_call(function, node) -> float:
+    # keep the garbage collector from adding noise to the scaling ratios
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function([node])
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+def main():
+    max_links = int(sys.argv[1]) if len(sys.argv) > 1 else 80000
+    legacy_max_links = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    sizes = []
+    size = 5000
+    while size <= max_links:
+        sizes.append(size)
+        size *= 2
+
+    print(f"{'links':>7} {'link s':>9} {'ratio':>6} {'image s':>9} {'ratio':>6} {'refs s':>9} {'ratio':>6} {'legacy s':>9} {'ratio':>6}")
+    previous = None
+    for size in sizes:
+        link_node = TextNode(link_paragraph(size), TextType.TEXT)
+        image_node = TextNode(image_paragraph(size), TextType.TEXT)
+        timings = (
+            time_call(split_nodes_link, link_node),
+            time_call(split_nodes_image, image_node),
+            time_call(lambda nodes: local_references(nodes[0].text), link_node),
+            time_call(legacy_split_nodes_link, link_node) if size <= legacy_max_links else None,
+        )
+
+        columns = [f"{size:>7}"]
+        for index, timing in enumerate(timings):
+            if timing is None:
+                columns.append(f"{'-':>9} {'-':>6}")
+                continue
+            ratio = f"{timing / previous[index]:.2f}" if previous and previous[index] else "-"
+            columns.append(f"{timing:>9.4f} {ratio:>6}")
+        print(" ".join(columns))
+        previous = timings
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+    Reports bytes per node for the slotted TextNode / LeafNode / ParentNode classes against
+    dict-backed equivalents (plain subclasses, which get a __dict__ back), and for a parsed page.
+
+    usage: python3 -m benchmarks.bench_memory [nodes]
+"""
+import random
+import sys
+import tracemalloc
+
+import benchmarks  # puts src/ on sys.path
+from benchmarks.corpus import page
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+from textnode_helpers import markdown_to_html_node
+
+# subclasses without __slots__ carry a per-instance __dict__, like the classes did before
+class DictTextNode(TextNode):
+    pass
+
+class DictLeafNode(LeafNode):
+    pass
+
+class DictParentNode(ParentNode):
+    pass
+
+def bytes_per_node(factory, count: int) -> float:
+    # the strings are shared between nodes, so only the node objects themselves are measured
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(index) for index in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the nodes costs one pointer per node
+    return (after - before) / len(nodes) - 8
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    children = [LeafNode(None, "text")]
+
+    cases = [
+        ("TextNode", lambda i: DictTextNode("text", TextType.LINK, "/url"), lambda i: TextNode("text", TextType.LINK, "/url")),
+        ("LeafNode", lambda i: DictLeafNode("b", "text"), lambda i: LeafNode("b", "text")),
+        ("ParentNode", lambda i: DictParentNode("p", children), lambda i: ParentNode("p", children)),
+    ]
+
+    print(f"{'class':<11} {'dict B/node':>12} {'slots B/node':>13} {'saved':>7}")
+    for name, dict_factory, slots_factory in cases:
+        dict_bytes = bytes_per_node(dict_factory, count)
+        slots_bytes = bytes_per_node(slots_factory, count)
+        print(f"{name:<11} {dict_bytes:>12.1f} {slots_bytes:>13.1f} {1 - slots_bytes / dict_bytes:>7.1%}")
+
+    # a full parsed page, text and all
+    markdown = "\n\n".join(page(random.Random(0), index, blocks=400) for index in range(5))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    html_node = markdown_to_html_node(markdown)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    nodes, stack = 0, [html_node]
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+    print(f"parsed page: {len(markdown)} chars, {nodes} nodes, {(after - before) / nodes:.1f} B/node including text")
+
+
+if __name__ == "__main__":
+    main()
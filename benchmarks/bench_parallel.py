@@ -0,0 +1,58 @@
+"""
+    Measures how page generation scales with --jobs and checks the parallel output matches the serial
+    build byte for byte.
+
+    usage: python3 -m benchmarks.bench_parallel [pages] [max_jobs]
+"""
+import contextlib
+import filecmp
+import io
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import write_corpus
+from generate_page import generate_pages_recursive
+
+def build(content_dir: str, template_path: str, dest_dir: str, jobs: int) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_pages_recursive("/", content_dir, template_path, dest_dir, jobs=jobs)
+    return time.perf_counter() - start
+
+def trees_match(left: str, right: str) -> bool:
+    comparison = filecmp.dircmp(left, right)
+    if comparison.left_only or comparison.right_only:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(left, right, comparison.common_files, shallow=False)
+    if mismatch or errors:
+        return False
+    return all(trees_match(os.path.join(left, sub), os.path.join(right, sub)) for sub in comparison.common_dirs)
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    job_counts = [1]
+    while job_counts[-1] * 2 <= max_jobs:
+        job_counts.append(job_counts[-1] * 2)
+    if job_counts[-1] != max_jobs:
+        job_counts.append(max_jobs)
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, template_path = write_corpus(root, pages=pages)
+        serial_dir = os.path.join(root, "serial")
+        serial_time = build(content_dir, template_path, serial_dir, jobs=1)
+
+        print(f"{pages} pages, {os.cpu_count()} CPUs")
+        print(f"{'jobs':>5} {'seconds':>9} {'speedup':>8} {'identical':>10}")
+        for jobs in job_counts:
+            dest_dir = os.path.join(root, f"jobs{jobs}")
+            elapsed = build(content_dir, template_path, dest_dir, jobs=jobs)
+            identical = trees_match(serial_dir, dest_dir)
+            print(f"{jobs:>5} {elapsed:>9.3f} {serial_time / elapsed:>8.2f} {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
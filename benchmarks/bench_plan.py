@@ -0,0 +1,53 @@
+"""
+    Benchmark for the planning walk over content/: build_plan.plan_site against the listdir walk it
+    replaced (kept here for comparison), which stats every entry with os.path.isfile, builds a Path per
+    entry to check its suffix, recurses per directory and stats each page once more for the manifest.
+
+    usage: python3 -m benchmarks.bench_plan [pages]
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import benchmarks  # puts src/ on sys.path
+from benchmarks.corpus import write_corpus
+from benchmarks.micro import best_time
+from build_plan import plan_site
+
+def legacy_collect_pages(dir_path_content: str, dest_dir_path: str) -> list:
+    pages = []
+    for item in os.listdir(dir_path_content):
+        src_item_path = os.path.join(dir_path_content, item)
+        dest_item_path = os.path.join(dest_dir_path, item)
+
+        if not os.path.isfile(src_item_path):
+            pages.extend(legacy_collect_pages(src_item_path, dest_item_path))
+
+        if Path(src_item_path).suffix.lower() == ".md":
+            pages.append((src_item_path, dest_item_path.replace(".md", ".html")))
+
+    return pages
+
+def legacy_plan(content_dir: str, dest_dir: str) -> list:
+    # the pages plus the stat the incremental checks took of each one
+    return [(src_item_path, dest_item_path, os.stat(src_item_path)) for src_item_path, dest_item_path in legacy_collect_pages(content_dir, dest_dir)]
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, _ = write_corpus(root, pages=pages, blocks=1)
+        dest_dir = os.path.join(root, "docs")
+
+        if sorted(page[:2] for page in legacy_plan(content_dir, dest_dir)) != [(page.source, page.dest) for page in plan_site(content_dir, dest_dir)]:
+            raise AssertionError("walks disagree")
+
+        legacy = best_time(lambda: legacy_plan(content_dir, dest_dir), repeat=7)
+        planned = best_time(lambda: plan_site(content_dir, dest_dir), repeat=7)
+        print(f"{pages} pages in {pages} directories")
+        print(f"listdir walk  {legacy * 1000:>8.2f}ms")
+        print(f"plan_site     {planned * 1000:>8.2f}ms {(planned / legacy - 1) * 100:>+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+    Compares peak memory of generating one very large page by reading it whole against streaming it
+    block by block (generate_page switches to streaming above STREAM_THRESHOLD).
+
+    usage: python3 -m benchmarks.bench_streaming [blocks]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+import benchmarks  # puts src/ on sys.path
+from benchmarks.corpus import TEMPLATE, page
+from generate_page import generate_page
+from page_template import PageTemplate
+
+def peak_memory(function) -> tuple:
+    # returns (peak traced bytes, seconds)
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.TemporaryDirectory() as root:
+        source = os.path.join(root, "index.md")
+        with open(source, 'w') as file:
+            file.write(page(random.Random(0), 0, blocks=blocks))
+        size = os.path.getsize(source)
+        template = PageTemplate(TEMPLATE)
+
+        results = {}
+        for name, threshold in (("whole", size + 1), ("streamed", 0)):
+            dest = os.path.join(root, f"{name}.html")
+
+            def build():
+                with mock.patch("generate_page.STREAM_THRESHOLD", threshold), contextlib.redirect_stdout(io.StringIO()):
+                    generate_page("/", source, "template.html", dest, template=template)
+
+            results[name] = peak_memory(build)
+
+        with open(os.path.join(root, "whole.html"), 'r') as whole, open(os.path.join(root, "streamed.html"), 'r') as streamed:
+            identical = whole.read() == streamed.read()
+
+    print(f"source: {size / (1 << 20):.1f} MiB, {blocks} blocks, outputs identical: {identical}")
+    for name, (peak, elapsed) in results.items():
+        print(f"{name:<9} peak {peak / (1 << 20):>8.2f} MiB  {elapsed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
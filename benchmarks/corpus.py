@@ -0,0 +1,106 @@
+"""
+    Synthetic markdown corpora for the benchmarks. Everything is driven by a seeded random.Random,
+    so the same settings always produce the same site.
+"""
+import os
+import random
+
+WORDS = (
+    "the ring bearer walked through rivendell while elves sang of gondolin and the old forest "
+    "was quiet under stars that bombadil named before the sun rose over the misty mountains"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+# relative weight of each block kind on a generated page
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 10,
+    "heading": 2,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 2,
+    "ordered_list": 1,
+}
+
+# inline markup wrapped around a word, picked at random for "styled" words
+INLINE_STYLES = ("**{}**", "_{}_", "`{}`")
+
+def sentence(rng: random.Random, words: int = 12, inline_density: float = 0.0) -> str:
+    """
+        A run of words; each word is styled as bold, italic or code with probability inline_density.
+    """
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if inline_density and rng.random() < inline_density:
+            word = rng.choice(INLINE_STYLES).format(word)
+        parts.append(word)
+    return " ".join(parts)
+
+def link(rng: random.Random) -> str:
+    return f"[{rng.choice(WORDS)} {rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})"
+
+def paragraph(rng: random.Random, inline_density: float = 0.1, links: int = 1) -> str:
+    parts = [sentence(rng, rng.randint(8, 16), inline_density) for _ in range(rng.randint(2, 5))]
+    # scatter the links between the sentences
+    for _ in range(links):
+        parts.insert(rng.randint(0, len(parts)), link(rng))
+    return " ".join(parts)
+
+def block(rng: random.Random, kind: str, inline_density: float = 0.1, links: int = 1) -> str:
+    if kind == "paragraph":
+        return paragraph(rng, inline_density, links)
+    if kind == "heading":
+        return f"{'#' * rng.randint(2, 6)} {sentence(rng, 5)}"
+    if kind == "code":
+        return "```\n" + "\n".join(f"print('{sentence(rng, 4)}')" for _ in range(rng.randint(2, 8))) + "\n```"
+    if kind == "quote":
+        return "\n".join(f"> {sentence(rng, 10, inline_density)}" for _ in range(rng.randint(1, 4)))
+    if kind == "unordered_list":
+        return "\n".join(f"- {sentence(rng, 6, inline_density)}" for _ in range(rng.randint(2, 8)))
+    if kind == "ordered_list":
+        return "\n".join(f"{item}. {sentence(rng, 6, inline_density)}" for item in range(1, rng.randint(2, 8) + 1))
+    raise ValueError(f"Unknown block kind [{kind}]")
+
+def page(rng: random.Random, index: int, blocks: int = 20, block_mix: dict = None, inline_density: float = 0.1, links: int = 1) -> str:
+    """
+        One markdown page: an h1 title followed by blocks drawn from block_mix. links is the number of
+        links per paragraph.
+    """
+    block_mix = block_mix or DEFAULT_BLOCK_MIX
+    kinds = list(block_mix)
+    weights = [block_mix[kind] for kind in kinds]
+
+    lines = [f"# Page {index}"]
+    for kind in rng.choices(kinds, weights, k=blocks):
+        lines.append(block(rng, kind, inline_density, links))
+    return "\n\n".join(lines) + "\n"
+
+def write_corpus(root: str, pages: int = 200, seed: int = 0, blocks: int = 20, block_mix: dict = None,
+                 inline_density: float = 0.1, links: int = 1) -> tuple:
+    """
+        Writes a synthetic site under root and returns the (content_dir, template_path) pair.
+    """
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    for index in range(pages):
+        page_dir = os.path.join(content_dir, "blog", f"section{index % 10}", f"post{index}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), 'w') as file:
+            file.write(page(rng, index, blocks, block_mix, inline_density, links))
+
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, 'w') as file:
+        file.write(TEMPLATE)
+
+    return content_dir, template_path
@@ -0,0 +1,86 @@
+"""
+    Micro-benchmarks for each stage of the pipeline, plus a full build. Every benchmark reports the
+    best time per call over several rounds, in seconds.
+"""
+import contextlib
+import gc
+import io
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.corpus import page, paragraph, write_corpus
+from generate_page import generate_pages_recursive
+from textnode_helpers import block_to_block_type, markdown_to_blocks, markdown_to_html_node, text_to_textnodes
+
+def best_time(function, repeat: int, min_round: float = 0.05) -> float:
+    """
+        Returns the fastest time per call over repeat rounds. Calls are batched so each round lasts at
+        least min_round seconds, which keeps fast functions above timer and scheduler noise.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        # calibrate the batch size, like timeit's autorange
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            if time.perf_counter() - start >= min_round:
+                break
+            number *= 2
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return min(timings)
+
+def sample_document(blocks: int, seed: int = 0, inline_density: float = 0.1, links: int = 1) -> str:
+    return page(random.Random(seed), 0, blocks=blocks, inline_density=inline_density, links=links)
+
+def run_micro_benchmarks(quick: bool = False) -> dict:
+    repeat = 3 if quick else 7
+    min_round = 0.02 if quick else 0.1
+
+    document = sample_document(blocks=200)
+    blocks = markdown_to_blocks(document)
+    paragraph_text = max(blocks, key=len)
+    html_node = markdown_to_html_node(document)
+    # link- and markup-heavy prose in a single long paragraph
+    rng = random.Random(1)
+    dense_text = " ".join(paragraph(rng, inline_density=0.5, links=5) for _ in range(40))
+
+    return {
+        "markdown_to_blocks": best_time(lambda: markdown_to_blocks(document), repeat, min_round),
+        "block_to_block_type": best_time(lambda: [block_to_block_type(block) for block in blocks], repeat, min_round),
+        "text_to_textnodes": best_time(lambda: text_to_textnodes(paragraph_text), repeat, min_round),
+        "text_to_textnodes_dense": best_time(lambda: text_to_textnodes(dense_text), repeat, min_round),
+        "markdown_to_html_node": best_time(lambda: markdown_to_html_node(document), repeat, min_round),
+        "to_html": best_time(html_node.to_html, repeat, min_round),
+    }
+
+def run_build_benchmark(pages: int = 200, quick: bool = False) -> dict:
+    # reported per page, so quick runs on a smaller corpus stay comparable with full ones
+    repeat = 2 if quick else 3
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, template_path = write_corpus(root, pages=pages)
+        dest_dir = os.path.join(root, "docs")
+
+        def build():
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive("/", content_dir, template_path, dest_dir)
+
+        return {"build_per_page": best_time(build, repeat, min_round=0) / pages}
+
+def run_all(quick: bool = False) -> dict:
+    results = run_micro_benchmarks(quick)
+    results.update(run_build_benchmark(pages=50 if quick else 200, quick=quick))
+    return results
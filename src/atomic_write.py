@@ -0,0 +1,54 @@
+import os
+
+# pages are streamed to disk through a buffer of this many bytes
+WRITE_BUFFER_SIZE = 1 << 16
+
+def files_equal(path_a: str, path_b: str) -> bool:
+    # sizes first, then the bytes; a missing file is never equal
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+    except FileNotFoundError:
+        return False
+
+    with open(path_a, 'rb') as file_a, open(path_b, 'rb') as file_b:
+        while True:
+            chunk_a = file_a.read(WRITE_BUFFER_SIZE)
+            if chunk_a != file_b.read(WRITE_BUFFER_SIZE):
+                return False
+            if not chunk_a:
+                return True
+
+
+class AtomicWriter():
+    """
+        Streams text into a temp file next to dest_path. On a clean exit the temp file replaces dest_path,
+        unless the content is identical to what is already there, in which case dest_path (and its mtime)
+        is left alone. Readers never see a half-written file, and nothing is left behind on an error.
+
+            with AtomicWriter(dest_path) as writer:
+                writer.write(html)
+            writer.changed  # True if dest_path was (re)written
+    """
+
+    def __init__(self, dest_path: str):
+        self.dest_path = dest_path
+        self.temp_path = f"{dest_path}.tmp-write"
+        self.changed = False
+        self._file = None
+
+    def __enter__(self) -> "AtomicWriter":
+        # exist_ok, since parallel workers may race to create the same directory
+        os.makedirs(os.path.dirname(self.dest_path), exist_ok=True)
+        self._file = open(self.temp_path, 'w', buffering=WRITE_BUFFER_SIZE)
+        # bound once, so streaming callers pay for a single attribute lookup per chunk
+        self.write = self._file.write
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._file.close()
+        if exc_type is not None or files_equal(self.temp_path, self.dest_path):
+            os.remove(self.temp_path)
+            return
+        os.replace(self.temp_path, self.dest_path)
+        self.changed = True
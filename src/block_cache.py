@@ -0,0 +1,132 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+import htmlnode
+import textnode
+import textnode_helpers
+
+# bump this whenever block rendering changes in a way the parser source hash below can't see
+CACHE_FORMAT_VERSION = 2
+
+# the default cap on the total size of cached html
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def renderer_fingerprint() -> str:
+    """
+        Combines the cache format version with a hash of the parser and renderer modules, so editing
+        any of them invalidates every cached block.
+    """
+    digest = hashlib.sha256(str(CACHE_FORMAT_VERSION).encode("utf-8"))
+    for module in (htmlnode, textnode, textnode_helpers):
+        with open(module.__file__, 'rb') as file:
+            digest.update(file.read())
+    return f"{CACHE_FORMAT_VERSION}:{digest.hexdigest()}"
+
+
+class BlockCache():
+    """
+        Persistent cache from a markdown block (its text plus its BlockType) to the html it renders to,
+        stored in sqlite so several build processes can share it. Least recently used entries are
+        evicted once the cached html grows past max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, context: str = ""):
+        self.path = path
+        self.max_bytes = max_bytes
+        # anything outside the block that changes its html (e.g. the basepath) goes in the context
+        self.context = context
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}
+        self._touched = set()
+
+        cache_dir = os.path.dirname(os.path.abspath(path))
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.connection = sqlite3.connect(path, timeout=30)
+        # WAL lets parallel workers read while another one commits
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, html TEXT NOT NULL, size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+        )
+
+        # a different parser version makes every entry suspect, so start over
+        fingerprint = renderer_fingerprint()
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != fingerprint:
+            with self.connection:
+                self.connection.execute("DELETE FROM blocks")
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (fingerprint,))
+
+    def key(self, block: str, block_type) -> str:
+        digest = hashlib.sha256()
+        for part in (self.context, block_type.value, block):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, block: str, block_type) -> str:
+        key = self.key(block, block_type)
+        if key in self._pending:
+            self.hits += 1
+            return self._pending[key]
+
+        row = self.connection.execute("SELECT html FROM blocks WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        # recency updates are batched up until the next flush
+        self.hits += 1
+        self._touched.add(key)
+        return row[0]
+
+    def put(self, block: str, block_type, html: str) -> None:
+        self._pending[self.key(block, block_type)] = html
+
+    def flush(self) -> None:
+        if not self._pending and not self._touched:
+            return
+
+        now = time.time_ns()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, size, last_used) VALUES (?, ?, ?, ?)",
+                [(key, html, len(html), now) for key, html in self._pending.items()],
+            )
+            self.connection.executemany(
+                "UPDATE blocks SET last_used = ? WHERE key = ?",
+                [(now, key) for key in self._touched],
+            )
+        self._pending = {}
+        self._touched = set()
+
+    def total_bytes(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+            Drops least recently used entries until the cached html fits in max_bytes.
+            Returns the number of entries removed.
+        """
+        # keep the most recently used entries whose running total still fits
+        with self.connection:
+            cursor = self.connection.execute(
+                """
+                DELETE FROM blocks WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running FROM blocks
+                    ) WHERE running > ?
+                )
+                """,
+                (self.max_bytes,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.flush()
+        self.evict()
+        self.connection.close()
@@ -0,0 +1,127 @@
+import hashlib
+import os
+from dependency_graph import BASEPATH_INPUT, TEMPLATE_INPUT, DependencyGraph, asset_input
+from json_manifest import load_manifest, save_manifest
+
+# version of the manifest layout, see json_manifest
+MANIFEST_VERSION = 3
+
+def hash_file(path: str) -> str:
+    # stream the file through the hash so large sources don't need to fit in memory
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cached_hash(entry: dict, full_path: str, stat: os.stat_result) -> str:
+    # skip re-hashing when size and mtime match the recorded entry
+    if entry is not None and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return entry["hash"]
+    return hash_file(full_path)
+
+
+class BuildManifest():
+    """
+        Records what the last build was generated from: the hash of the template, the basepath, the
+        fingerprint of the renderer that built the pages (see block_cache.renderer_fingerprint),
+        for each source page the hash of its content and the output it produced, the hashes of the
+        static assets pages reference, and the dependency graph tying outputs to all of these.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.template_hash = None
+        self.basepath = None
+        self.renderer = None
+        # relative source path -> {"hash", "size", "mtime_ns", "output"}
+        self.pages = {}
+        # relative asset path -> {"hash", "size", "mtime_ns"}
+        self.assets = {}
+        self.graph = DependencyGraph()
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        manifest = cls(path)
+        # a missing, unreadable or outdated manifest just means a full rebuild
+        data = load_manifest(path, MANIFEST_VERSION)
+        if data is None:
+            return manifest
+
+        manifest.template_hash = data.get("template_hash")
+        manifest.basepath = data.get("basepath")
+        manifest.renderer = data.get("renderer")
+        manifest.pages = data.get("pages", {})
+        manifest.assets = data.get("assets", {})
+        manifest.graph = DependencyGraph.from_dict(data.get("graph", {}))
+        return manifest
+
+    def save(self) -> None:
+        if self.path is None:
+            raise ValueError("BuildManifest has no path to save to")
+
+        save_manifest(self.path, MANIFEST_VERSION, {
+            "template_hash": self.template_hash,
+            "basepath": self.basepath,
+            "renderer": self.renderer,
+            "pages": self.pages,
+            "assets": self.assets,
+            "graph": self.graph.to_dict(),
+        })
+
+    def source_hash(self, rel_path: str, full_path: str, stat: os.stat_result = None) -> str:
+        if stat is None:
+            stat = os.stat(full_path)
+        return cached_hash(self.pages.get(rel_path), full_path, stat)
+
+    def refresh_assets(self, static_dir: str) -> set:
+        """
+            Re-fingerprints every static asset the dependency graph references and returns the inputs
+            of those that changed or disappeared since they were last recorded.
+        """
+        # without a static directory asset dependencies can't be checked, so they are left alone
+        if static_dir is None:
+            return set()
+
+        assets = {}
+        changed = set()
+        for rel_asset in self.graph.assets():
+            full_path = os.path.join(static_dir, rel_asset)
+            if not os.path.isfile(full_path):
+                changed.add(asset_input(rel_asset))
+                continue
+
+            stat = os.stat(full_path)
+            entry = self.assets.get(rel_asset)
+            asset_hash = cached_hash(entry, full_path, stat)
+            if entry is None or entry.get("hash") != asset_hash:
+                changed.add(asset_input(rel_asset))
+            assets[rel_asset] = {"hash": asset_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+        self.assets = assets
+        return changed
+
+    @staticmethod
+    def page_entry(source_hash: str, stat: os.stat_result, rel_output: str) -> dict:
+        return {
+            "hash": source_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "output": rel_output,
+        }
+
+    def changed_inputs(self, template_hash: str, basepath: str, static_dir: str = None, renderer: str = None) -> set:
+        # the build-wide inputs that differ from the last build; page sources are checked one by one.
+        # A different renderer can change any page, just like a different template
+        changed = self.refresh_assets(static_dir)
+        if self.template_hash != template_hash or self.renderer != renderer:
+            changed.add(TEMPLATE_INPUT)
+        if self.basepath != basepath:
+            changed.add(BASEPATH_INPUT)
+        return changed
+
+    def page_is_current(self, rel_path: str, source_hash: str, rel_output: str) -> bool:
+        entry = self.pages.get(rel_path)
+        if entry is None:
+            return False
+        return entry.get("hash") == source_hash and entry.get("output") == rel_output
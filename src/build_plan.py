@@ -0,0 +1,45 @@
+import os
+from typing import NamedTuple
+from copy_static_content import walk_tree
+
+class PlannedPage(NamedTuple):
+    """
+        One markdown page of the site: its source and output paths, relative to the content and output
+        directories, the full paths behind them, and the source's os.stat_result from the walk.
+    """
+    rel_source: str
+    rel_output: str
+    source: str
+    dest: str
+    stat: os.stat_result
+
+
+def output_path(rel_source: str) -> str:
+    # content/blog/post.md is written to docs/blog/post.html
+    return rel_source.replace(".md", ".html")
+
+
+def is_page(name: str) -> bool:
+    # splitext, like Path.suffix, doesn't take a bare ".md" for an extension
+    return os.path.splitext(name)[1].lower() == ".md"
+
+
+def plan_site(dir_path_content: str, dest_dir_path: str) -> tuple:
+    """
+        Walks dir_path_content in a single scandir pass and returns the build plan: a PlannedPage for every
+        markdown file, sorted by rel_source so the same tree always gives the same plan. Directory entries
+        already say whether they are directories, so the only syscall per page is the stat that the
+        incremental checks (see build_manifest) reuse instead of touching the file again.
+    """
+    content_full = os.path.abspath(dir_path_content)
+    dest_full = os.path.abspath(dest_dir_path)
+
+    pages = []
+    for rel_path, entry in walk_tree(content_full):
+        if not is_page(entry.name) or entry.is_dir():
+            continue
+        rel_output = output_path(rel_path)
+        pages.append(PlannedPage(rel_path, rel_output, entry.path, os.path.join(dest_full, rel_output), entry.stat()))
+
+    pages.sort(key=lambda page: page.rel_source)
+    return tuple(pages)
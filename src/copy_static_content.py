@@ -1,5 +1,23 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from build_manifest import cached_hash, hash_file
+from json_manifest import load_manifest, save_manifest
+
+# versions of the static and asset (fingerprint) manifest layouts, see json_manifest
+STATIC_MANIFEST_VERSION = 1
+ASSET_MANIFEST_VERSION = 1
+
+# hex digits of the content hash kept in fingerprinted file names
+FINGERPRINT_LENGTH = 12
+
+# assets pages and the template link to. Anything else (CNAME, robots.txt, .nojekyll, favicon.ico,
+# downloads) keeps its name, since it's fetched by a name that other software expects
+FINGERPRINTED_EXTENSIONS = {
+    ".css", ".js", ".mjs",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+}
 
 def copy_static_content(src: str, dest: str) -> None:
     
@@ -13,19 +31,258 @@ def copy_static_content(src: str, dest: str) -> None:
     
     # first delete dest
     if os.path.exists(dest_full):
-        shutil.rmtree(dest_full)
+        remove_tree(dest_full)
     
     # then re-create it
     os.mkdir(dest_full)
 
-    # get contents of source
-    for item in os.listdir(src_full):
-        src_item_path = os.path.join(src_full, item)
-        dest_item_path = os.path.join(dest_full, item)
-        if os.path.isfile(src_item_path):
-            shutil.copy(src_item_path, dest_item_path)
+    # get contents of source; walk_tree yields each directory before its contents
+    for rel_path, entry in walk_tree(src_full):
+        dest_item_path = os.path.join(dest_full, rel_path)
+        if entry.is_dir():
+            os.mkdir(dest_item_path)
         else:
-            copy_static_content(src_item_path, dest_item_path)
-    
+            shutil.copy(entry.path, dest_item_path)
+
+
+def walk_tree(root: str, follow_symlinks: bool = True):
+    """
+        Yields (rel_path, os.DirEntry) for everything under root, depth first and in scandir order, each
+        directory right before its contents. The walk keeps an explicit stack instead of recursing, so
+        hierarchies deeper than the recursion limit are fine, and each directory is read in full before
+        descending into it, so only one directory handle is open at a time.
+    """
+    with os.scandir(root) as entries:
+        stack = [("", iter(list(entries)))]
+    while stack:
+        rel_dir, entries = stack[-1]
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            yield rel_path, entry
+            if entry.is_dir(follow_symlinks=follow_symlinks):
+                with os.scandir(entry.path) as children:
+                    stack.append((rel_path, iter(list(children))))
+                break
+        else:
+            stack.pop()
+
+
+def remove_tree(root: str) -> None:
+    # shutil.rmtree recurses once per level, so deep trees are removed deepest first off walk_tree.
+    # Symlinks are removed, never followed
+    for rel_path, entry in reversed(list(walk_tree(root, follow_symlinks=False))):
+        if entry.is_dir(follow_symlinks=False):
+            os.rmdir(entry.path)
+        else:
+            os.remove(entry.path)
+    os.rmdir(root)
+
+
+def list_files(root: str) -> list:
+    # relative paths of every file under root, using scandir so each entry costs a single stat
+    return [rel_path for rel_path, entry in walk_tree(root) if not entry.is_dir()]
+
+
+def remove_file_and_empty_dirs(root: str, rel_path: str) -> None:
+    file_path = os.path.join(root, rel_path)
+    if os.path.isfile(file_path):
+        os.remove(file_path)
+
+    # clean up any directories the file leaves empty, stopping at the root
+    parent_dir = os.path.dirname(file_path)
+    while parent_dir != root and os.path.isdir(parent_dir) and not os.listdir(parent_dir):
+        os.rmdir(parent_dir)
+        parent_dir = os.path.dirname(parent_dir)
+
+
+def file_is_current(src_path: str, dest_path: str, check_hash: bool = False, refresh_stat: bool = True) -> bool:
+    try:
+        src_stat = os.stat(src_path)
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if not check_hash:
+        return False
+
+    # same size but different mtime: only the content can tell
+    if hash_file(src_path) != hash_file(dest_path):
+        return False
+
+    # refresh the mtime so the next sync can take the cheap path, unless dest has to stay untouched
+    if refresh_stat:
+        shutil.copystat(src_path, dest_path)
+    return True
+
+
+def copy_file_contents(src_path: str, dest_path: str) -> None:
+    # copy_file_range lets the kernel (or filesystem, for reflinks) move the data without a round trip through Python
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src_path, 'rb') as src_file, open(dest_path, 'wb') as dest_file:
+                remaining = os.fstat(src_file.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_file.fileno(), dest_file.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return
+        except OSError:
+            # not supported between these filesystems, fall back to a regular copy
+            pass
+
+    shutil.copyfile(src_path, dest_path)
+
+
+def sync_file(src_path: str, dest_path: str, link: bool = False) -> None:
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    if link:
+        try:
+            temp_path = f"{dest_path}.tmp-link"
+            os.link(src_path, temp_path)
+            os.replace(temp_path, dest_path)
+            return
+        except OSError:
+            # hardlinks don't work across devices (or at all on some filesystems), so copy instead
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # copy to a temp file and swap it in. writing straight into dest_path would also
+    # overwrite the source when dest_path is a hardlink left over from a previous sync
+    temp_path = f"{dest_path}.tmp-copy"
+    copy_file_contents(src_path, temp_path)
+    shutil.copystat(src_path, temp_path)
+    os.replace(temp_path, dest_path)
+
+
+def load_synced_files(manifest_path: str) -> list:
+    data = load_manifest(manifest_path, STATIC_MANIFEST_VERSION)
+    return data.get("files", []) if data is not None else []
+
+
+def save_synced_files(manifest_path: str, files: list) -> None:
+    save_manifest(manifest_path, STATIC_MANIFEST_VERSION, {"files": sorted(files)})
+
+
+def is_fingerprinted(rel_path: str) -> bool:
+    return os.path.splitext(rel_path)[1].lower() in FINGERPRINTED_EXTENSIONS
+
+
+def fingerprinted_path(rel_path: str, file_hash: str) -> str:
+    # images/tom.png -> images/tom.<hash>.png
+    root, extension = os.path.splitext(rel_path)
+    return f"{root}.{file_hash[:FINGERPRINT_LENGTH]}{extension}"
+
+
+def load_asset_manifest(manifest_path: str) -> dict:
+    data = load_manifest(manifest_path, ASSET_MANIFEST_VERSION)
+    return data.get("assets", {}) if data is not None else {}
+
+
+def save_asset_manifest(manifest_path: str, assets: dict) -> None:
+    save_manifest(manifest_path, ASSET_MANIFEST_VERSION, {"assets": assets})
+
+
+def load_asset_urls(manifest_path: str) -> dict:
+    # original path -> fingerprinted path, as used to rewrite urls (see textnode.resolve_url)
+    return {rel_path: entry["output"] for rel_path, entry in load_asset_manifest(manifest_path).items()}
+
+
+def fingerprint_files(src: str, rel_paths: list, previous_assets: dict) -> dict:
+    """
+        Maps each file to {"hash", "size", "mtime_ns", "output"}, where output is its fingerprinted name.
+        Files whose size and mtime match previous_assets aren't hashed again.
+    """
+    assets = {}
+    for rel_path in rel_paths:
+        full_path = os.path.join(src, rel_path)
+        stat = os.stat(full_path)
+        file_hash = cached_hash(previous_assets.get(rel_path), full_path, stat)
+        assets[rel_path] = {
+            "hash": file_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "output": fingerprinted_path(rel_path, file_hash),
+        }
+    return assets
+
+
+def fingerprint_static_content(src: str, asset_manifest_path: str) -> dict:
+    """
+        Records the fingerprinted name of every asset under src in asset_manifest_path, as
+        sync_static_content does, without copying anything. For builds whose pages link to static files
+        that another build ships, such as shards other than 0 (see sharding).
+    """
+    if not os.path.exists(src):
+        raise ValueError(f"Source path [{src}] not found")
+
+    src_full = os.path.abspath(src)
+    assets = fingerprint_files(src_full, [rel_path for rel_path in list_files(src_full) if is_fingerprinted(rel_path)], load_asset_manifest(asset_manifest_path))
+    save_asset_manifest(asset_manifest_path, assets)
+    return assets
+
+
+def sync_static_content(src: str, dest: str, manifest_path: str = None, check_hash: bool = False, link: bool = False, workers: int = 8,
+                        asset_manifest_path: str = None) -> list:
+    """
+        Incrementally mirrors src into dest. Unlike copy_static_content it leaves the rest of dest alone:
+        only files whose size or mtime (or, with check_hash, content) differ are copied, on a thread pool,
+        and only files recorded in the manifest from the previous sync that have since left src are deleted.
+        With an asset_manifest_path, assets (see FINGERPRINTED_EXTENSIONS) are copied under fingerprinted
+        names (name.<hash>.ext) and the mapping is recorded there, so they can be served with long-lived
+        cache headers.
+        Returns the relative paths in dest that were copied or removed.
+    """
+    # first, make sure the source directory exists
+    if not os.path.exists(src):
+        raise ValueError(f"Source path [{src}] not found")
+
+    # get absolute paths for each
+    src_full = os.path.abspath(src)
+    dest_full = os.path.abspath(dest)
+    os.makedirs(dest_full, exist_ok=True)
+
+    current_files = list_files(src_full)
+    if asset_manifest_path is not None:
+        assets = fingerprint_files(src_full, [rel_path for rel_path in current_files if is_fingerprinted(rel_path)], load_asset_manifest(asset_manifest_path))
+        save_asset_manifest(asset_manifest_path, assets)
+        dest_paths = {rel_path: assets[rel_path]["output"] if rel_path in assets else rel_path for rel_path in current_files}
+    else:
+        dest_paths = {rel_path: rel_path for rel_path in current_files}
+
+    changed_files = [
+        rel_path for rel_path in current_files
+        if not file_is_current(os.path.join(src_full, rel_path), os.path.join(dest_full, dest_paths[rel_path]), check_hash)
+    ]
+
+    def copy_one(rel_path: str) -> None:
+        sync_file(os.path.join(src_full, rel_path), os.path.join(dest_full, dest_paths[rel_path]), link)
+
+    if workers > 1 and len(changed_files) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # consume the results so any copy error is raised here
+            for _ in executor.map(copy_one, changed_files):
+                pass
+    else:
+        for rel_path in changed_files:
+            copy_one(rel_path)
+
+    # only delete what a previous sync put there, generated pages share the same tree.
+    # the manifest lists paths in dest, so an asset's old fingerprinted name is cleaned up too
+    synced_files = list(dest_paths.values())
+    synced_set = set(synced_files)
+    removed_files = [rel_path for rel_path in load_synced_files(manifest_path) if rel_path not in synced_set]
+    for rel_path in removed_files:
+        remove_file_and_empty_dirs(dest_full, rel_path)
+
+    if manifest_path is not None:
+        save_synced_files(manifest_path, synced_files)
 
-    
\ No newline at end of file
+    print(f"Synced static content: {len(changed_files)} copied, {len(removed_files)} removed, {len(current_files) - len(changed_files)} unchanged")
+    return [dest_paths[rel_path] for rel_path in changed_files] + removed_files
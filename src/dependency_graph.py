@@ -0,0 +1,104 @@
+import os
+from textnode_helpers import LINK_PATTERN
+
+# inputs shared by every page
+TEMPLATE_INPUT = "template"
+BASEPATH_INPUT = "basepath"
+
+# prefixes for per-file inputs, followed by the path relative to content/ or static/
+SOURCE_PREFIX = "content:"
+ASSET_PREFIX = "static:"
+
+def source_input(rel_source: str) -> str:
+    return SOURCE_PREFIX + rel_source
+
+def asset_input(rel_asset: str) -> str:
+    return ASSET_PREFIX + rel_asset
+
+
+def local_references(markdown: str) -> list:
+    """
+        Returns the site-relative urls ("/images/tom.png") of every link and image in the markdown, in
+        order and without duplicates. The link pattern also matches the bracketed part of an image.
+    """
+    # a dict rather than a list, so checking for duplicates stays O(1) on link-heavy pages
+    urls = {}
+    for match in LINK_PATTERN.finditer(markdown):
+        url = match.group(2)
+        if url.startswith("/") and not url.startswith("//"):
+            urls[url] = None
+    return list(urls)
+
+
+def asset_for_url(url: str, static_dir: str) -> str:
+    # maps a site-relative url onto a file under static_dir, or None if it isn't one
+    path = url.split("#", 1)[0].split("?", 1)[0].lstrip("/")
+    if not path:
+        return None
+    rel_asset = os.path.normpath(path)
+    if rel_asset.startswith(".."):
+        return None
+    return rel_asset if os.path.isfile(os.path.join(static_dir, rel_asset)) else None
+
+
+def page_inputs(rel_source: str, references: list, static_dir: str = None) -> list:
+    """
+        The inputs a generated page depends on: the template, the basepath, its own source and any
+        static files it links to or embeds.
+    """
+    inputs = [TEMPLATE_INPUT, BASEPATH_INPUT, source_input(rel_source)]
+    if static_dir is not None:
+        for url in references:
+            rel_asset = asset_for_url(url, static_dir)
+            if rel_asset is not None:
+                inputs.append(asset_input(rel_asset))
+    return inputs
+
+
+class DependencyGraph():
+    """
+        Maps every output (relative to docs/) to the inputs it was generated from, and each input back to
+        the outputs that depend on it, so a set of changed inputs can be turned into a set of dirty outputs.
+    """
+
+    def __init__(self):
+        # output -> set of inputs
+        self.dependencies = {}
+        # input -> set of outputs
+        self.dependents = {}
+
+    def set_dependencies(self, output: str, inputs) -> None:
+        self.remove_output(output)
+        self.dependencies[output] = set(inputs)
+        for input_key in self.dependencies[output]:
+            self.dependents.setdefault(input_key, set()).add(output)
+
+    def remove_output(self, output: str) -> None:
+        for input_key in self.dependencies.pop(output, ()):
+            outputs = self.dependents[input_key]
+            outputs.discard(output)
+            if not outputs:
+                del self.dependents[input_key]
+
+    def inputs(self) -> set:
+        return set(self.dependents)
+
+    def assets(self) -> list:
+        # relative paths of the static files any output depends on
+        return sorted(input_key[len(ASSET_PREFIX):] for input_key in self.dependents if input_key.startswith(ASSET_PREFIX))
+
+    def dirty_outputs(self, changed_inputs) -> set:
+        dirty = set()
+        for input_key in changed_inputs:
+            dirty.update(self.dependents.get(input_key, ()))
+        return dirty
+
+    def to_dict(self) -> dict:
+        return {output: sorted(inputs) for output, inputs in self.dependencies.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DependencyGraph":
+        graph = cls()
+        for output, inputs in data.items():
+            graph.set_dependencies(output, inputs)
+        return graph
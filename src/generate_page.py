@@ -1,13 +1,51 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from textnode_helpers import (
+    blocks_to_html_node,
     extract_title,
-    markdown_to_html_node
+    extract_title_from_lines,
+    iter_markdown_blocks,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    render_blocks
 )
-from pathlib import Path
+from atomic_write import AtomicWriter
+from block_cache import BlockCache, renderer_fingerprint
+from htmlnode import HTMLNode
+from build_manifest import BuildManifest
+from dependency_graph import local_references, page_inputs
+from page_template import PageTemplate
+from profiling import BuildProfiler, PageProfile
+from copy_static_content import remove_file_and_empty_dirs
+from build_plan import output_path, plan_site
+from sharding import ShardManifest, plan_digest, select_shard
 
-def generate_page(basepath: str, from_path: str, template_path: str, dest_path: str) -> None:
+# sources larger than this are read and rendered block by block instead of being loaded whole
+STREAM_THRESHOLD = 8 << 20
 
+def generate_page(basepath: str, from_path: str, template_path: str, dest_path: str, template: PageTemplate = None, block_cache: BlockCache = None, profile: PageProfile = None) -> tuple:
+    """
+        Generates dest_path from the markdown at from_path. Link and image urls are resolved with the
+        template's basepath and assets map. Returns the site-relative urls the page references, for the
+        dependency graph, and whether dest_path changed: identical output leaves the existing file and
+        its mtime untouched.
+    """
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if profile is not None:
+        profile.start()
+    if source_size(from_path) > STREAM_THRESHOLD:
+        if template is None:
+            template = PageTemplate.load(template_path, basepath)
+        # reading, rendering and writing are interleaved block by block, so they are timed as one phase
+        references, changed = stream_large_page(basepath, from_path, dest_path, template, block_cache)
+        if profile is not None:
+            profile.lap("stream")
+        if block_cache is not None:
+            block_cache.flush()
+            if profile is not None:
+                profile.lap("cache")
+        return references, changed
 
     try:
         with open(from_path, 'r') as file:
@@ -17,31 +55,191 @@ def generate_page(basepath: str, from_path: str, template_path: str, dest_path:
     except Exception as e:
         print(f"An error occurred: {e}")
 
-    try:
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-    except FileNotFoundError:
-        print(f"Error: Template file path '{template_path}' not found.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    if profile is not None:
+        profile.lap("read")
 
-    # convert to HTMLNode and generate html content
-    html_content = (markdown_to_html_node(from_content)).to_html()
+    # callers building many pages compile the template once and pass it in
+    if template is None:
+        template = PageTemplate.load(template_path, basepath)
+
+    # convert to HTMLNode, the html itself is streamed out below
+    if profile is None:
+        html_node = markdown_to_html_node(from_content, block_cache=block_cache, basepath=basepath, assets=template.assets)
+    else:
+        md_blocks = markdown_to_blocks(from_content)
+        profile.lap("blocks")
+        html_node = blocks_to_html_node(md_blocks, block_cache=block_cache, basepath=basepath, assets=template.assets)
     content_title = extract_title(from_content)
 
-    page_html = (template_content.replace("{{ Content }}", html_content)).replace("{{ Title }}", content_title)
-    # replace any href and src references to include the basepath
-    page_html = (page_html.replace('href="/', f'href="{basepath}')).replace('src="/', f'src="{basepath}')
+    if profile is not None:
+        profile.lap("parse")
+        changed = write_page_profiled(dest_path, template, content_title, html_node, profile)
+    else:
+        changed = stream_page(dest_path, template, content_title, html_node)
+
+    # commit this page's new blocks, so other workers can pick them up
+    if block_cache is not None:
+        block_cache.flush()
+        if profile is not None:
+            profile.lap("cache")
+
+    return local_references(from_content), changed
+
+
+def source_size(from_path: str) -> int:
+    # a missing source is reported by the regular path
+    try:
+        return os.path.getsize(from_path)
+    except OSError:
+        return 0
+
+
+def stream_large_page(basepath: str, from_path: str, dest_path: str, template: PageTemplate, block_cache: BlockCache = None) -> tuple:
+    """
+        Generates a page without holding its source or output in memory: one pass over the file finds
+        the title, a second one renders it block by block straight into the output. Peak memory is
+        proportional to the largest block. Returns the same (references, changed) pair as generate_page.
+    """
+    with open(from_path, 'r') as file:
+        content_title = extract_title_from_lines(file)
+
+    # a dict keeps the references in order without duplicates
+    references = {}
+
+    def read_blocks():
+        with open(from_path, 'r') as file:
+            for block in iter_markdown_blocks(file):
+                references.update(dict.fromkeys(local_references(block)))
+                yield block
+
+    # a markdown error halfway through leaves the previous output in place
+    with AtomicWriter(dest_path) as writer:
+        template.stream(writer.write, content_title, lambda write: render_blocks(read_blocks(), write, block_cache, basepath, template.assets))
+
+    return list(references), writer.changed
+
+
+def stream_page(dest_path: str, template: PageTemplate, content_title: str, html_node: HTMLNode) -> bool:
+    # the basepath is already in the template and in the page's link and image nodes
+    with AtomicWriter(dest_path) as writer:
+        template.stream(writer.write, content_title, html_node.render)
+    return writer.changed
+
+
+def write_page_profiled(dest_path: str, template: PageTemplate, content_title: str, html_node: HTMLNode, profile: PageProfile) -> bool:
+    # same output as stream_page, but rendering, template substitution and the write
+    # happen one after the other so each can be timed on its own
+    content_chunks = []
+    html_node.render(content_chunks.append)
+    profile.lap("render")
+
+    page_chunks = []
+    template.stream(page_chunks.append, content_title, lambda write: write("".join(content_chunks)))
+    page_html = "".join(page_chunks)
+    profile.lap("template")
+
+    with AtomicWriter(dest_path) as writer:
+        writer.write(page_html)
+    profile.lap("write")
+    return writer.changed
+
+
+# compiled template for pool workers, sent once per worker rather than once per task,
+# the worker's own connection to the block cache, and whether pages should be profiled
+_worker_template = None
+_worker_block_cache = None
+_worker_profiling = False
 
-    # check if the destination directories exist, if not create them
-    if not os.path.exists(os.path.dirname(dest_path)):
-        os.makedirs(os.path.dirname(dest_path))
+def _init_worker(template: PageTemplate, block_cache_path: str = None, profiling: bool = False) -> None:
+    global _worker_template, _worker_block_cache, _worker_profiling
+    _worker_template = template
+    # cached blocks carry the basepath and asset names in their urls
+    _worker_block_cache = BlockCache(block_cache_path, context=template.url_context) if block_cache_path is not None else None
+    _worker_profiling = profiling
 
-    with open(dest_path, 'w') as file:
-        file.write(page_html)
 
+def _generate_page_task(task: tuple) -> tuple:
+    # module level so it can be pickled and sent to pool workers
+    basepath, from_path, template_path, dest_path = task
+    profile = PageProfile(from_path) if _worker_profiling else None
+    references, changed = generate_page(basepath=basepath, from_path=from_path, template_path=template_path, dest_path=dest_path, template=_worker_template, block_cache=_worker_block_cache, profile=profile)
+    return from_path, references, changed, profile
 
-def generate_pages_recursive(basepath: str, dir_path_content: str, template_path: str, dest_dir_path: str) -> None:
+
+def generate_pages(basepath: str, pages: list, template_path: str, jobs: int = 1, template: PageTemplate = None, block_cache_path: str = None, profiler: BuildProfiler = None) -> tuple:
+    """
+        Generates every (source, destination) pair in pages. Returns the urls each source references and
+        the destinations whose content actually changed. With jobs > 1 the pages are spread across a
+        process pool; tasks are handed out in chunks so small pages aren't dominated by IPC overhead.
+        block_cache_path turns on the persistent block render cache (see block_cache.BlockCache), and a
+        profiler collects per-page timings.
+    """
+    references = {}
+    changed_outputs = []
+    if len(pages) == 0:
+        return references, changed_outputs
+
+    if template is None:
+        template = PageTemplate.load(template_path, basepath)
+
+    tasks = [(basepath, src_item_path, template_path, dest_item_path) for src_item_path, dest_item_path in pages]
+
+    if jobs <= 1 or len(tasks) <= 1:
+        _init_worker(template, block_cache_path, profiler is not None)
+        try:
+            for task in tasks:
+                src_item_path, references[src_item_path], changed, profile = _generate_page_task(task)
+                if changed:
+                    changed_outputs.append(task[3])
+                if profiler is not None:
+                    profiler.add_page(profile)
+        finally:
+            if _worker_block_cache is not None:
+                _worker_block_cache.close()
+            _init_worker(None)
+        return references, changed_outputs
+
+    workers = min(jobs, len(tasks))
+    # a few chunks per worker keeps the pool balanced when page sizes vary
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(template, block_cache_path, profiler is not None)) as executor:
+        # consume the results so any worker exception is raised here
+        for task, (src_item_path, references[src_item_path], changed, profile) in zip(tasks, executor.map(_generate_page_task, tasks, chunksize=chunksize)):
+            if changed:
+                changed_outputs.append(task[3])
+            if profiler is not None:
+                profiler.add_page(profile)
+
+    # workers commit as they go, trimming the cache back to size is left to the parent
+    if block_cache_path is not None:
+        BlockCache(block_cache_path).close()
+    return references, changed_outputs
+
+
+def page_dest_path(src_item_path: str, dir_path_content: str, dest_dir_path: str) -> str:
+    # same mapping as build_plan.plan_site, for a single source file
+    rel_source = os.path.relpath(src_item_path, dir_path_content)
+    return os.path.join(dest_dir_path, output_path(rel_source))
+
+
+def remove_stale_output(dest_dir_path: str, rel_output: str) -> None:
+    print(f"Removing {os.path.join(dest_dir_path, rel_output)} (source was deleted)")
+    remove_file_and_empty_dirs(dest_dir_path, rel_output)
+
+
+def generate_pages_recursive(basepath: str, dir_path_content: str, template_path: str, dest_dir_path: str, manifest_path: str = None, jobs: int = 1, block_cache_path: str = None, profiler: BuildProfiler = None, static_dir: str = None, assets: dict = None, minify: bool = False,
+                             shard: tuple = None, shard_manifest_path: str = None) -> list:
+    """
+        Generates a html page for every markdown file under dir_path_content. When a manifest_path is given,
+        only the pages whose inputs changed since the last build are regenerated (see dependency_graph), and
+        outputs whose sources were deleted are removed. static_dir lets pages depend on the assets they
+        reference there, and assets (original static path -> fingerprinted path, see
+        copy_static_content.load_asset_urls) points their urls at fingerprinted names, and minify streams
+        every page through an HTMLMinifier (see minify). jobs > 1 generates the pages on a process pool.
+        shard (index, count) builds only the pages that fall in that shard (see sharding.select_shard), and
+        writes its partial manifest to shard_manifest_path once they are done.
+        Returns the outputs, relative to dest_dir_path, that were written with new content or removed.
+    """
     # first, make sure the source directory exists
     if not os.path.exists(dir_path_content):
         raise ValueError(f"Source path [{dir_path_content}] not found")
@@ -50,13 +248,77 @@ def generate_pages_recursive(basepath: str, dir_path_content: str, template_path
     content_full = os.path.abspath(dir_path_content)
     dest_full = os.path.abspath(dest_dir_path)
 
-    for item in os.listdir(content_full):
-        src_item_path = os.path.join(content_full, item)
-        dest_item_path = os.path.join(dest_full, item)
+    # walking the tree and checking the manifest is timed as the "plan" phase
+    def plan_phase():
+        return profiler.phase("plan") if profiler is not None else nullcontext()
+
+    with plan_phase():
+        plan = plan_site(content_full, dest_full)
+
+        # compile the template once for the whole build
+        template = PageTemplate.load(template_path, basepath, assets, minify)
+
+        if shard is not None:
+            site_plan = plan
+            plan = select_shard(site_plan, shard)
+            shard_manifest = ShardManifest(shard[0], shard[1], {page.rel_source: page.rel_output for page in plan}, len(site_plan),
+                                           plan_digest(page.rel_source for page in site_plan), template.digest, basepath)
+            # the old partial manifest goes first and the new one is only written at the end, so a shard
+            # that fails halfway can't be merged with outputs left over from an earlier build
+            if shard_manifest_path is not None and os.path.exists(shard_manifest_path):
+                os.remove(shard_manifest_path)
+
+    def finish(changed: list) -> list:
+        if shard is not None and shard_manifest_path is not None:
+            shard_manifest.save(shard_manifest_path)
+        return sorted(changed)
+
+    # without a manifest, every page gets rebuilt
+    if manifest_path is None:
+        _, changed_outputs = generate_pages(basepath, [(page.source, page.dest) for page in plan], template_path, jobs=jobs, template=template, block_cache_path=block_cache_path, profiler=profiler)
+        return finish([os.path.relpath(dest_item_path, dest_full) for dest_item_path in changed_outputs])
+
+    with plan_phase():
+        manifest = BuildManifest.load(manifest_path)
+        template_hash = template.digest
+        renderer = renderer_fingerprint()
+        # template, renderer, basepath and asset changes, mapped onto the outputs that depend on them
+        dirty_outputs = manifest.graph.dirty_outputs(manifest.changed_inputs(template_hash, basepath, static_dir, renderer))
+
+        current_pages = {}
+        pages_to_build = []
+        for page in plan:
+            # the stat from the walk decides whether the source has to be hashed again
+            source_hash = manifest.source_hash(page.rel_source, page.source, page.stat)
+
+            if page.rel_output in dirty_outputs or not manifest.page_is_current(page.rel_source, source_hash, page.rel_output) or not os.path.exists(page.dest):
+                pages_to_build.append(page)
+
+            current_pages[page.rel_source] = BuildManifest.page_entry(source_hash, page.stat, page.rel_output)
+
+    references, changed_outputs = generate_pages(basepath, [(page.source, page.dest) for page in pages_to_build], template_path, jobs=jobs, template=template, block_cache_path=block_cache_path, profiler=profiler)
+    changed = [os.path.relpath(dest_item_path, dest_full) for dest_item_path in changed_outputs]
+
+    # anything left in the old manifest no longer has a source
+    for rel_source, entry in manifest.pages.items():
+        if rel_source not in current_pages:
+            remove_stale_output(dest_full, entry["output"])
+            manifest.graph.remove_output(entry["output"])
+            changed.append(entry["output"])
+
+    # rebuilt pages get their dependencies recorded afresh, the others keep theirs
+    for page in pages_to_build:
+        manifest.graph.set_dependencies(page.rel_output, page_inputs(page.rel_source, references[page.source], static_dir))
 
-        if not os.path.isfile(src_item_path):
-            generate_pages_recursive(basepath=basepath, dir_path_content=src_item_path, template_path=template_path, dest_dir_path=dest_item_path)
+    skipped = len(plan) - len(pages_to_build)
+    if skipped:
+        print(f"Skipped {skipped} unchanged page(s)")
 
-        # use generate_page to generate the html and copy to the target
-        if Path(src_item_path).suffix.lower() == ".md":
-            generate_page(basepath=basepath, from_path=src_item_path, template_path=template_path, dest_path=dest_item_path.replace(".md", ".html"))
+    manifest.template_hash = template_hash
+    manifest.basepath = basepath
+    manifest.renderer = renderer
+    manifest.pages = current_pages
+    # fingerprint any assets the rebuilt pages started referencing
+    manifest.refresh_assets(static_dir)
+    manifest.save()
+    return finish(changed)
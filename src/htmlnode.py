@@ -1,4 +1,31 @@
+from functools import lru_cache
+
+def escape_text(text: str) -> str:
+    """
+        Escapes &, < and > for use as element content. Most text has nothing to escape, and checking
+        for that first is much cheaper than escaping; when there is, chained replaces beat str.translate.
+    """
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+def escape_attribute(value: str) -> str:
+    # as escape_text, plus the double quotes attribute values are wrapped in
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    return value
+
+@lru_cache(maxsize=4096)
+def attributes_to_html(items: tuple) -> str:
+    # pages repeat the same props (the same link, the same image) over and over, so the escaped
+    # attribute string is built once per distinct set of (name, value) pairs
+    return "".join([f' {k}="{escape_attribute(str(v))}"' for k, v in items])
+
+
 class HTMLNode():
+    # large pages allocate tens of thousands of nodes, so skip the per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str = None, value: str = None, children: list = None, props: dict = None):
         # TODO: maybe add in validation for children (should be of type HTMLNode??)
 
@@ -7,63 +34,151 @@ class HTMLNode():
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def render(self, write) -> None:
+        """
+            Streams the node's html into write (any callable taking a str, such as a file's write method)
+            as a series of chunks, without building the whole string.
+        """
+        raise NotImplementedError("Method requires override")
+
+    def iter_html(self):
+        """
+            Yields the node's html as a series of chunks.
+        """
         raise NotImplementedError("Method requires override")
-    
+
+    def to_html(self) -> str:
+        chunks = []
+        self.render(chunks.append)
+        return "".join(chunks)
+
     def props_to_html(self) -> str:
         if self.props == None:
             return ""
-        
+
         if not isinstance(self.props, dict):
             raise TypeError(f"HTMLNode.props attribute must be a dict. Type was {type(self.props)}")
-        
-        property_string = ""
-        for k,v in self.props.items():
-            # leading whitespace below is intentional
-            property_string += f' {k}="{v}"'
-
-        return property_string
-    
+
+        # leading whitespace is part of each attribute string
+        try:
+            return attributes_to_html(tuple(self.props.items()))
+        except TypeError:
+            # an unhashable value can't be a cache key
+            return attributes_to_html.__wrapped__(tuple(self.props.items()))
+
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
-    
+
 class LeafNode(HTMLNode):
+    # the escaped value is kept together with the value it was escaped from, and the attribute string
+    # together with the props items it was built from, so a leaf rendered over and over escapes and
+    # serializes once, and assigning a new value or changing props is still picked up
+    __slots__ = ("_escaped_source", "_escaped_value", "_attributes_source", "_attributes")
+
     def __init__(self, tag: str = None, value: str = "", props: dict = None):
-        super().__init__(tag, value, None, props)
+        # set directly rather than through HTMLNode.__init__: leaves are by far the most common node,
+        # and the extra call is a sizeable share of building one
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+        self._escaped_source = None
+        self._escaped_value = None
+        self._attributes_source = None
+        self._attributes = None
 
-    def to_html(self):
-        if self.value == None:
+    def props_to_html(self) -> str:
+        if self.props is None:
+            return ""
+        if not isinstance(self.props, dict):
+            return super().props_to_html()
+
+        # comparing the items is much cheaper than serializing them again
+        items = tuple(self.props.items())
+        if items != self._attributes_source:
+            self._attributes = super().props_to_html()
+            self._attributes_source = items
+        return self._attributes
+
+    def render(self, write) -> None:
+        write(self._leaf_html())
+
+    def iter_html(self):
+        yield self._leaf_html()
+
+    def _leaf_html(self) -> str:
+        value = self.value
+        if value == None:
             raise ValueError("Value cannot be None.")
-    
+
+        # strings are immutable, so the same object always escapes the same way
+        if value is not self._escaped_source:
+            self._escaped_source = value
+            self._escaped_value = escape_text(value)
+
         if self.tag is None:
-            return self.value
+            return self._escaped_value
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{self._escaped_value}</{self.tag}>"
 
-        # if self.tag != None:
-        #     output_string = output_string.replace(output_string,f"<{self.tag}{self.props_to_html()}>{output_string}</{self.tag}>")
-        
-        # return output_string
-    
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
-    
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list["HTMLNode"], props: dict = None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def _validate(self) -> None:
         if self.tag == None or len(self.tag) == 0:
             raise ValueError("Tag cannot be None or empty")
         if self.children == None:
             raise ValueError("ParentNode must include a children property")
-        
-        output_text = ""
-        for node in self.children:
-            output_text += node.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{output_text}</{self.tag}>"
+
+    def render(self, write) -> None:
+        # nested ParentNodes are walked with an explicit stack of (node, remaining children) rather than
+        # by recursing, so arbitrarily deep trees render without hitting the recursion limit
+        self._validate()
+        write(f"<{self.tag}{self.props_to_html()}>")
+        stack = [(self, iter(self.children))]
+        while stack:
+            parent, children = stack[-1]
+            for node in children:
+                if isinstance(node, ParentNode):
+                    node._validate()
+                    write(f"<{node.tag}{node.props_to_html()}>")
+                    stack.append((node, iter(node.children)))
+                    break
+                node.render(write)
+            else:
+                stack.pop()
+                write(f"</{parent.tag}>")
+
+    def iter_html(self):
+        # the same chunks as render, which holds the one copy of the tree walk; driving it from a
+        # generator instead would slow down render, the path every page takes
+        chunks = []
+        self.render(chunks.append)
+        yield from chunks
 
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
 
-        
+class RawNode(HTMLNode):
+    """
+        Html that has already been rendered (e.g. a cached block), written out as-is, without escaping.
+    """
+    __slots__ = ()
+
+    def __init__(self, value: str):
+        super().__init__(None, value, None, None)
+
+    def render(self, write) -> None:
+        write(self.value)
+
+    def iter_html(self):
+        yield self.value
+
+    def __repr__(self):
+        return f"RawNode({self.value})"
@@ -0,0 +1,28 @@
+import json
+import os
+
+def load_manifest(path: str, version: int) -> dict:
+    """
+        The data save_manifest wrote to path, or None if there is no such file, it can't be read, or it
+        has another version. Each manifest has its own version constant, bumped whenever its layout
+        changes; they only save work, so callers treat None as starting from scratch.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def save_manifest(path: str, version: int, data: dict) -> None:
+    # write to a temp file and swap it in, so an interrupted build never leaves half a manifest
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as file:
+        json.dump({**data, "version": version}, file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
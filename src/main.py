@@ -1,20 +1,142 @@
+import argparse
+import os
 import sys
+from contextlib import nullcontext
 from textnode import TextNode, TextType
-from copy_static_content import copy_static_content
+from copy_static_content import fingerprint_static_content, load_asset_urls, remove_tree, sync_static_content
 from generate_page import generate_page, generate_pages_recursive
+from precompress import DEFAULT_MIN_SIZE, precompress_outputs
+from profiling import BuildProfiler
+from sharding import SHARD_DOCS_DIR, SHARD_MANIFEST_NAME, merge_shards, parse_shard
+from watch import SiteWatcher
 
-def main():
-    # check provided arguments to set the base path, if none, set to "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    else:
-        basepath = "/"
+def parse_args(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate the static site in docs/ from content/ and static/")
+    # the base path is optional and positional, so `main.py "/ss-generator/"` keeps working
+    parser.add_argument("basepath", nargs="?", default="/", help="base path prepended to site-relative links (default: /)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes for page generation (0 = one per CPU)")
+    parser.add_argument("--clean", action="store_true", help="delete docs/ and the build caches first, forcing a full rebuild")
+    parser.add_argument("--hash", action="store_true", help="compare static files by content when their size matches but mtime differs")
+    parser.add_argument("--link", action="store_true", help="hardlink static files into docs/ instead of copying them, where possible")
+    parser.add_argument("--block-cache", action="store_true", help="reuse rendered html for unchanged markdown blocks across builds (stored in .cache/)")
+    parser.add_argument("--watch", action="store_true", help="after building, keep watching content/, static/ and template.html and rebuild on change")
+    parser.add_argument("--fingerprint", action="store_true", help="copy static files as name.<hash>.ext and point pages and the template at the hashed names")
+    parser.add_argument("--minify", action="store_true", help="collapse whitespace, drop comments and optional attribute quotes in generated pages")
+    parser.add_argument("--gzip", action="store_true", help="write a .gz copy (level 9) next to every html, css and text file in docs/ that shrinks")
+    parser.add_argument("--gzip-min-size", type=int, default=DEFAULT_MIN_SIZE, help=f"smallest file --gzip compresses, in bytes (default: {DEFAULT_MIN_SIZE})")
+    parser.add_argument("--changed-list", help="where to write the docs/ paths this build wrote or removed, one per line (default: .cache/changed-files.txt)")
+    parser.add_argument("--profile", action="store_true", help="time each build phase and page, print the slowest pages and write a JSON report")
+    parser.add_argument("--profile-output", help="where --profile writes its JSON report (default: .cache/profile.json)")
+    parser.add_argument("--profile-top", type=int, default=10, help="number of slowest pages --profile prints (default: 10)")
+    parser.add_argument("--shard", type=shard_arg, help="build only shard i of N (e.g. 0/4) into its worker directory, to be combined with `main.py merge`; shard 0 also copies static/")
+    parser.add_argument("--worker-dir", help="where --shard writes its docs/, .cache/ and partial manifest (default: .shards/<i>)")
+    args = parser.parse_args(argv)
+    if args.shard is not None and args.watch:
+        parser.error("--watch can't be combined with --shard")
+    return args
+
+def parse_merge_args(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="main.py merge", description="Combine the worker directories of a sharded build (see --shard) into docs/")
+    parser.add_argument("worker_dirs", nargs="+", help="the worker directory of every shard")
+    parser.add_argument("--dest", default="docs", help="where to put the merged site (default: docs)")
+    parser.add_argument("--manifest", default=".cache/merge-manifest.json", help="records the merged files, so the next merge can remove the ones that went away (default: .cache/merge-manifest.json)")
+    parser.add_argument("--changed-list", default=".cache/changed-files.txt", help="where to write the paths the merge wrote or removed, one per line (default: .cache/changed-files.txt)")
+    return parser.parse_args(argv)
+
+def shard_arg(value: str) -> tuple:
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+def write_changed_list(path: str, changed: list) -> None:
+    # for upload steps that only want to ship what this build actually touched
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as file:
+        for rel_path in sorted(changed):
+            file.write(f"{rel_path}\n")
+    print(f"{len(changed)} file(s) changed in docs/, listed in {path}")
+
+def merge(argv: list) -> None:
+    args = parse_merge_args(argv)
+    try:
+        changed = merge_shards(args.worker_dirs, args.dest, manifest_path=args.manifest)
+    except ValueError as e:
+        # what doesn't add up is the whole message, a traceback would only bury it
+        sys.exit(str(e))
+    write_changed_list(args.changed_list, changed)
+
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+    # a subcommand of its own rather than an argparse subparser, which would take over the optional basepath
+    if argv[:1] == ["merge"]:
+        merge(argv[1:])
+        return
+
+    args = parse_args(argv)
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # a shard builds into its own worker directory, with its own caches
+    docs_dir, cache_dir = "docs", ".cache"
+    owns_static = True
+    if args.shard is not None:
+        worker_dir = args.worker_dir or os.path.join(".shards", str(args.shard[0]))
+        docs_dir, cache_dir = os.path.join(worker_dir, SHARD_DOCS_DIR), os.path.join(worker_dir, ".cache")
+        # shard 0 ships static/, the others only link to it
+        owns_static = args.shard[0] == 0
+        print(f"Building shard {args.shard[0]}/{args.shard[1]} into {worker_dir}")
 
     print(f"Using basepath: {basepath}")
-    copy_static_content("static", "docs")
+    if args.clean:
+        for path in (docs_dir, cache_dir):
+            if os.path.exists(path):
+                remove_tree(path)
+
+    profiler = BuildProfiler() if args.profile else None
+
+    def phase(name: str):
+        return profiler.phase(name) if profiler is not None else nullcontext()
+
+    asset_manifest_path = os.path.join(cache_dir, "asset-manifest.json") if args.fingerprint else None
+
+    def sync_static() -> list:
+        if owns_static:
+            return sync_static_content("static", docs_dir, manifest_path=os.path.join(cache_dir, "static-manifest.json"), check_hash=args.hash, link=args.link, asset_manifest_path=asset_manifest_path)
+        if asset_manifest_path is not None:
+            fingerprint_static_content("static", asset_manifest_path)
+        return []
+
+    with phase("static"):
+        changed_static = sync_static()
+    assets = load_asset_urls(asset_manifest_path) if asset_manifest_path is not None else None
     # generate_page("content/index.md", "template.html", "public/index.html")
-    generate_pages_recursive(basepath=basepath, dir_path_content="content", template_path="template.html", dest_dir_path="docs")
+    block_cache_path = os.path.join(cache_dir, "blocks.sqlite") if args.block_cache else None
+    shard_manifest_path = os.path.join(worker_dir, SHARD_MANIFEST_NAME) if args.shard is not None else None
+    changed_pages = generate_pages_recursive(basepath=basepath, dir_path_content="content", template_path="template.html", dest_dir_path=docs_dir, manifest_path=os.path.join(cache_dir, "build-manifest.json"), jobs=jobs, block_cache_path=block_cache_path, profiler=profiler, static_dir="static", assets=assets, minify=args.minify,
+                                             shard=args.shard, shard_manifest_path=shard_manifest_path)
+
+    gzip_manifest_path = os.path.join(cache_dir, "gzip-manifest.json") if args.gzip else None
+    changed_gzip = []
+    if args.gzip:
+        with phase("gzip"):
+            changed_gzip = precompress_outputs(docs_dir, manifest_path=gzip_manifest_path, min_size=args.gzip_min_size)
+
+    write_changed_list(args.changed_list or os.path.join(cache_dir, "changed-files.txt"), changed_static + changed_pages + changed_gzip)
+
+    if profiler is not None:
+        profile_output = args.profile_output or os.path.join(cache_dir, "profile.json")
+        print(profiler.report(args.profile_top))
+        profiler.write_json(profile_output)
+        print(f"Wrote profile to {profile_output}")
+
+    if args.watch:
+        watcher = SiteWatcher(basepath, "content", "static", "template.html", docs_dir, manifest_path=os.path.join(cache_dir, "build-manifest.json"),
+                              static_manifest_path=os.path.join(cache_dir, "static-manifest.json"), block_cache_path=block_cache_path, jobs=jobs,
+                              asset_manifest_path=asset_manifest_path, minify=args.minify, check_hash=args.hash, link=args.link,
+                              gzip_manifest_path=gzip_manifest_path, gzip_min_size=args.gzip_min_size)
+        watcher.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,260 @@
+import re
+from functools import lru_cache
+
+# elements whose content is passed through untouched: whitespace is significant in pre and textarea,
+# code samples should read exactly as written, and script and style aren't html
+VERBATIM_TAGS = {"pre", "code", "textarea", "script", "style"}
+
+# elements that never render inline, so whitespace next to their tags never shows
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "base", "script", "style", "noscript",
+    "article", "aside", "section", "nav", "header", "footer", "main", "address", "div", "p", "hr", "pre",
+    "blockquote", "figure", "figcaption", "details", "summary", "dialog", "form", "fieldset", "legend",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hgroup", "ul", "ol", "li", "dl", "dt", "dd",
+    "table", "caption", "colgroup", "col", "thead", "tbody", "tfoot", "tr", "th", "td",
+}
+
+# elements that can't have content, so a trailing "/" in their start tag means nothing
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# incoming chunks are collected up to this many characters before they are minified in one go
+MINIFY_BUFFER_SIZE = 1 << 16
+
+# how far ahead a "<" that doesn't close yet is waited on before it's taken to be plain text
+MAX_TAG_LENGTH = 1 << 16
+
+# a start/end tag or doctype. As in the html tokenizer, quotes only delimit a value right after "=",
+# so a ">" inside a quoted value doesn't end the tag
+TAG_REST = r"""(?:[^>=]|=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["']))*>"""
+TAG = r"<[!/]?[A-Za-z]" + TAG_REST
+TAG_PATTERN = re.compile(TAG)
+# splits html into text, tag, text, tag, ..., text
+TAG_SPLIT_PATTERN = re.compile(f"({TAG})")
+COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+# where a batch can't be minified in one go: a comment (which may hide tags) or a verbatim element
+VERBATIM_START_PATTERN = re.compile(r"<!--|<(?:pre|code|textarea|script|style)(?=[\s/>])", re.IGNORECASE)
+TAG_NAME_PATTERN = re.compile(r"<(/?)([^\s/>]+)")
+ATTRIBUTE_PATTERN = re.compile(r"""\s+([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+# attribute values that can go without quotes
+UNQUOTED_VALUE = re.compile(r"""[^\s"'=<>`]+""")
+# runs of html whitespace (which unlike \s leaves non-breaking spaces alone), other than single spaces
+WHITESPACE = re.compile(r"[\t\n\r\f][ \t\n\r\f]*| [ \t\n\r\f]+")
+# the end tag that closes each verbatim element
+VERBATIM_END_PATTERNS = {name: re.compile(f"</{name}(?=[\\s/>])", re.IGNORECASE) for name in VERBATIM_TAGS}
+
+def minify_start_tag(tag: str, name: str) -> str:
+    """
+        Rewrites a start tag with single spaces between attributes, without the quotes around values
+        that don't need them and without the "/" of a void element. A tag that doesn't parse is
+        returned unchanged.
+    """
+    position = 1 + len(name)
+    end = len(tag) - 1
+    parts = [tag[:position]]
+    while True:
+        match = ATTRIBUTE_PATTERN.match(tag, position, end)
+        if match is None:
+            break
+        attribute, double_quoted, single_quoted, unquoted = match.groups()
+        position = match.end()
+
+        value = double_quoted if double_quoted is not None else single_quoted if single_quoted is not None else unquoted
+        if value is None:
+            parts.append(f" {attribute}")
+        elif UNQUOTED_VALUE.fullmatch(value):
+            parts.append(f" {attribute}={value}")
+        elif '"' in value:
+            parts.append(f" {attribute}='{value}'")
+        else:
+            parts.append(f' {attribute}="{value}"')
+
+    rest = tag[position:end].strip()
+    if rest == "/":
+        if name.lower() not in VOID_TAGS:
+            parts.append(" /")
+    elif rest:
+        return tag
+    parts.append(">")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def parse_tag(tag: str) -> tuple:
+    """
+        Returns (minified tag, whether it is a block level tag, verbatim element it opens or None) for
+        a tag matched by TAG_PATTERN. Pages repeat the same few tags over and over, so the results are
+        cached.
+    """
+    closing, name = TAG_NAME_PATTERN.match(tag).groups()
+    lower_name = name.lower()
+    if lower_name.startswith("!"):
+        return tag, True, None
+    block = lower_name in BLOCK_TAGS
+    if closing:
+        return tag, block, None
+
+    tag = minify_start_tag(tag, name)
+    return tag, block, lower_name if lower_name in VERBATIM_TAGS and not tag.endswith("/>") else None
+
+
+class HTMLMinifier():
+    """
+        Wraps a write callable (such as AtomicWriter.write) and minifies the html streamed through it:
+        comments are dropped, runs of whitespace collapse to a single space (or to nothing next to block
+        level tags), and start tags lose optional quotes. The content of pre, code, textarea, script and
+        style elements is passed through as is. Only a bounded buffer and an incomplete trailing tag are
+        held back between writes, so the page is never materialized in full; call close() to flush.
+
+            minifier = HTMLMinifier(writer.write)
+            template.stream(minifier.write, title, render_content)
+            minifier.close()
+    """
+
+    def __init__(self, write):
+        self._write = write
+        self._chunks = []
+        self._size = 0
+        # unprocessed text carried over from the previous batch, e.g. half a tag
+        self._carry = ""
+        # the verbatim element we are in, if any
+        self._verbatim = None
+        # whether whitespace was skipped since the last thing written, and whether that was a block tag
+        self._pending_space = False
+        self._after_block = True
+
+    def write(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if self._size >= MINIFY_BUFFER_SIZE:
+            self._process(final=False)
+
+    def close(self) -> None:
+        self._process(final=True)
+
+    def _process(self, final: bool) -> None:
+        buffer = self._carry + "".join(self._chunks)
+        self._chunks = []
+        self._size = 0
+
+        # the batch is minified into a list and written in one go
+        output = []
+        position = 0
+        length = len(buffer)
+        while position < length:
+            if self._verbatim is not None:
+                match = VERBATIM_END_PATTERNS[self._verbatim].search(buffer, position)
+                if match is None:
+                    # keep "</name" plus the character after it back, so an end tag split across
+                    # batches is still found
+                    end = length if final else max(position, length - len(self._verbatim) - 3)
+                    output.append(buffer[position:end])
+                    position = end
+                    break
+                output.append(buffer[position:match.start()])
+                position = match.start()
+                self._verbatim = None
+                continue
+
+            # everything up to the next verbatim element is minified as one region
+            end, opening = self._region_end(buffer, position, final)
+            self._minify_region(buffer[position:end], output)
+            position = end
+            if opening is None:
+                break
+
+            tag, block, self._verbatim = parse_tag(opening.group())
+            self._append_tag(tag, block, output)
+            position = opening.end()
+
+        self._carry = buffer[position:]
+        self._write("".join(output))
+
+    def _region_end(self, buffer: str, position: int, final: bool) -> tuple:
+        """
+            Returns where the region starting at position ends, and the match for the verbatim start tag
+            that ends it, if any. Short of that, the region stops before a comment or tag that isn't
+            complete yet, unless this is the final batch.
+        """
+        search_from = position
+        while True:
+            match = VERBATIM_START_PATTERN.search(buffer, search_from)
+            if match is None:
+                break
+            if match.group() == "<!--":
+                close = buffer.find("-->", match.end())
+                if close == -1:
+                    if final:
+                        return len(buffer), None
+                    return match.start(), None
+                search_from = close + 3
+                continue
+
+            opening = TAG_PATTERN.match(buffer, match.start())
+            if opening is not None:
+                return match.start(), opening
+            if final:
+                # not a tag after all, so just text
+                search_from = match.end()
+                continue
+            return match.start(), None
+
+        end = len(buffer)
+        if not final:
+            last = buffer.rfind("<", position)
+            next_char = buffer[last + 1:last + 2]
+            if (last != -1 and end - last < MAX_TAG_LENGTH and (next_char == "" or next_char.isalpha() or next_char in "!/")
+                    and TAG_PATTERN.match(buffer, last) is None):
+                # the tag continues in the next batch
+                end = last
+        return end, None
+
+    def _minify_region(self, region: str, output: list) -> None:
+        if not region:
+            return
+        if "<!--" in region:
+            region = COMMENT_PATTERN.sub("", region)
+
+        parts = TAG_SPLIT_PATTERN.split(region)
+        # collapsing all the text between the tags in one call is much cheaper than once per text
+        if "\0" not in region:
+            texts = WHITESPACE.sub(" ", "\0".join(parts[0::2])).split("\0")
+        else:
+            texts = [WHITESPACE.sub(" ", text) for text in parts[0::2]]
+        # the same tag strings come up again and again, so they are minified through a cache
+        tags, tag_blocks, _ = zip(*map(parse_tag, parts[1::2])) if len(parts) > 1 else ((), (), ())
+
+        # blocks[i] and blocks[i + 1] tell whether the tags on either side of texts[i] are block level,
+        # and a space next to one never shows. What follows the last text isn't known yet, so a space
+        # at its end is held back
+        blocks = [self._after_block, *tag_blocks, None]
+        if self._pending_space and not texts[0].startswith(" "):
+            texts[0] = " " + texts[0]
+
+        last = len(texts) - 1
+        self._pending_space = texts[last].endswith(" ")
+        for index in [index for index, text in enumerate(texts) if text[:1] == " " or text[-1:] == " "]:
+            text = texts[index]
+            if text == " ":
+                texts[index] = "" if blocks[index] or blocks[index + 1] or index == last else " "
+                continue
+            if text[0] == " " and blocks[index]:
+                text = text[1:]
+            if text[-1] == " " and (blocks[index + 1] or index == last):
+                text = text[:-1]
+            texts[index] = text
+
+        if texts[last]:
+            self._after_block = False
+        elif tags:
+            self._after_block = tag_blocks[-1]
+
+        parts[0::2] = texts
+        parts[1::2] = tags
+        output.append("".join(parts))
+
+    def _append_tag(self, tag: str, block: bool, output: list) -> None:
+        if self._pending_space and not block and not self._after_block:
+            output.append(" ")
+        self._pending_space = False
+        self._after_block = block
+        output.append(tag)
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import re
+from htmlnode import escape_text
+from minify import HTMLMinifier
+from textnode import resolve_url
+
+TITLE_SLOT = "{{ Title }}"
+CONTENT_SLOT = "{{ Content }}"
+
+# site-relative href and src attributes; protocol-relative "//host" urls are external
+SITE_URL_ATTRIBUTE = re.compile(r'\b(href|src)="(/(?!/)[^"]*)"')
+
+def rewrite_basepath(html: str, basepath: str, assets: dict = None) -> str:
+    """
+        Prefixes the template's own site-relative href and src references with the basepath, pointing
+        references to fingerprinted static files at their hashed names on the way. Page content gets
+        the same treatment when its link and image nodes are built (see textnode.resolve_url).
+    """
+    if basepath == "/" and not assets:
+        return html
+    return SITE_URL_ATTRIBUTE.sub(lambda match: f'{match.group(1)}="{resolve_url(match.group(2), basepath, assets)}"', html)
+
+def url_context(basepath: str, assets: dict = None) -> str:
+    # everything besides the markdown itself that ends up in a page's urls, for the block cache
+    if not assets:
+        return basepath
+    assets_hash = hashlib.sha256(json.dumps(assets, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{basepath}\0{assets_hash}"
+
+
+class PageTemplate():
+    """
+        A page template compiled once per build. The template text is split into static segments around
+        the {{ Title }} and {{ Content }} slots, with the basepath and fingerprinted asset names already
+        applied to the template's own href and src attributes, so rendering a page is a single join.
+        Pages rendered with the template resolve their own urls through the same assets map. With
+        minify, streamed pages go through an HTMLMinifier on their way out.
+    """
+
+    def __init__(self, text: str, basepath: str = "/", assets: dict = None, minify: bool = False):
+        self.basepath = basepath
+        self.assets = assets
+        self.minify = minify
+        self.url_context = url_context(basepath, assets)
+
+        # pieces holds the static segments, with a placeholder at each slot position
+        self.pieces = []
+        self.slot_positions = []
+        # the basepath is tracked on its own, but a stylesheet getting a new fingerprint is a template change
+        digest = hashlib.sha256(text.encode("utf-8"))
+        if assets:
+            digest.update(rewrite_basepath(text, "/", assets).encode("utf-8"))
+        # switching minification on or off changes every page too
+        if minify:
+            digest.update(b"\0minify")
+        self.digest = digest.hexdigest()
+
+        remaining_text = rewrite_basepath(text, basepath, assets)
+        while True:
+            slot_name, slot_index = self._next_slot(remaining_text)
+            if slot_name is None:
+                self.pieces.append(remaining_text)
+                break
+
+            self.pieces.append(remaining_text[:slot_index])
+            self.slot_positions.append((len(self.pieces), slot_name))
+            self.pieces.append(slot_name)
+            remaining_text = remaining_text[slot_index + len(slot_name):]
+
+    @staticmethod
+    def _next_slot(text: str) -> tuple:
+        # find whichever slot comes first in the text
+        next_name, next_index = None, -1
+        for slot_name in (TITLE_SLOT, CONTENT_SLOT):
+            index = text.find(slot_name)
+            if index != -1 and (next_index == -1 or index < next_index):
+                next_name, next_index = slot_name, index
+        return next_name, next_index
+
+    @classmethod
+    def load(cls, template_path: str, basepath: str = "/", assets: dict = None, minify: bool = False) -> "PageTemplate":
+        try:
+            with open(template_path, 'r') as file:
+                return cls(file.read(), basepath, assets, minify)
+        except FileNotFoundError:
+            raise ValueError(f"Template file path [{template_path}] not found")
+
+    def stream(self, write, title: str, render_content) -> None:
+        """
+            Writes the page into write piece by piece. render_content is called with write when the
+            {{ Content }} slot is reached, so the page body can be streamed rather than passed as a string.
+            The title is plain text and is escaped on the way in.
+        """
+        if self.minify:
+            minifier = HTMLMinifier(write)
+            write = minifier.write
+
+        slot_names = dict(self.slot_positions)
+        for position, piece in enumerate(self.pieces):
+            slot_name = slot_names.get(position)
+            if slot_name == CONTENT_SLOT:
+                render_content(write)
+            elif slot_name == TITLE_SLOT:
+                write(escape_text(title))
+            else:
+                write(piece)
+
+        if self.minify:
+            minifier.close()
+
+    def render(self, title: str, content: str) -> str:
+        values = {TITLE_SLOT: escape_text(title), CONTENT_SLOT: content}
+        pieces = list(self.pieces)
+        for position, slot_name in self.slot_positions:
+            pieces[position] = values[slot_name]
+        return "".join(pieces)
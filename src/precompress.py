@@ -0,0 +1,103 @@
+import gzip
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from copy_static_content import list_files, remove_file_and_empty_dirs
+from json_manifest import load_manifest, save_manifest
+
+# version of the gzip manifest layout, see json_manifest
+GZIP_MANIFEST_VERSION = 1
+
+# text outputs worth serving precompressed; images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = {".html", ".htm", ".css", ".js", ".json", ".svg", ".txt", ".xml"}
+
+# below this many bytes the gzip header and a second file aren't worth it
+DEFAULT_MIN_SIZE = 1024
+
+def compress_file(path: str, min_size: int = DEFAULT_MIN_SIZE) -> bool:
+    """
+        Writes path.gz at maximum compression, if path is at least min_size bytes and actually shrinks.
+        Otherwise any old .gz sibling is removed. Returns True if a .gz sibling was kept.
+    """
+    gz_path = f"{path}.gz"
+    size = os.path.getsize(path)
+    if size >= min_size:
+        # mtime=0 keeps the output byte-for-byte reproducible, so unchanged pages give unchanged .gz files
+        temp_path = f"{gz_path}.tmp-gzip"
+        with open(path, 'rb') as src_file, open(temp_path, 'wb') as temp_file:
+            with gzip.GzipFile(filename="", mode='wb', compresslevel=9, fileobj=temp_file, mtime=0) as gz_file:
+                shutil.copyfileobj(src_file, gz_file, 1 << 16)
+
+        if os.path.getsize(temp_path) < size:
+            os.replace(temp_path, gz_path)
+            return True
+        os.remove(temp_path)
+
+    if os.path.exists(gz_path):
+        os.remove(gz_path)
+    return False
+
+
+def load_compressed_files(manifest_path: str) -> dict:
+    data = load_manifest(manifest_path, GZIP_MANIFEST_VERSION)
+    return data.get("files", {}) if data is not None else {}
+
+
+def save_compressed_files(manifest_path: str, files: dict) -> None:
+    save_manifest(manifest_path, GZIP_MANIFEST_VERSION, {"files": files})
+
+
+def precompress_outputs(dest: str, manifest_path: str = None, min_size: int = DEFAULT_MIN_SIZE, workers: int = 8) -> list:
+    """
+        Writes a .gz sibling next to every compressible file under dest, on a thread pool (zlib releases
+        the GIL). The manifest records the size and mtime each file had when it was last compressed, so
+        only files that changed since then are compressed again. Returns the relative paths of the .gz
+        files that were written or removed.
+    """
+    dest_full = os.path.abspath(dest)
+    previous_files = load_compressed_files(manifest_path)
+
+    # rel path -> [size, mtime_ns, whether a .gz sibling was kept]
+    current_files = {}
+    to_compress = []
+    for rel_path in list_files(dest_full):
+        if Path(rel_path).suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+            continue
+
+        full_path = os.path.join(dest_full, rel_path)
+        stat = os.stat(full_path)
+        entry = previous_files.get(rel_path)
+        if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns] and entry[2] == os.path.exists(f"{full_path}.gz"):
+            current_files[rel_path] = entry
+        else:
+            to_compress.append((rel_path, [stat.st_size, stat.st_mtime_ns]))
+
+    def compress_one(item: tuple) -> bool:
+        return compress_file(os.path.join(dest_full, item[0]), min_size)
+
+    if workers > 1 and len(to_compress) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            kept = list(executor.map(compress_one, to_compress))
+    else:
+        kept = [compress_one(item) for item in to_compress]
+
+    changed = []
+    compressed = 0
+    for (rel_path, key), gz_kept in zip(to_compress, kept):
+        current_files[rel_path] = key + [gz_kept]
+        compressed += gz_kept
+        if gz_kept or (previous_files.get(rel_path) or [None, None, False])[2]:
+            changed.append(f"{rel_path}.gz")
+
+    # sources that are gone leave their .gz behind
+    for rel_path, entry in previous_files.items():
+        if rel_path not in current_files and entry[2]:
+            remove_file_and_empty_dirs(dest_full, f"{rel_path}.gz")
+            changed.append(f"{rel_path}.gz")
+
+    if manifest_path is not None:
+        save_compressed_files(manifest_path, current_files)
+
+    print(f"Precompressed outputs: {compressed} compressed, {len(to_compress) - compressed} skipped, {len(current_files) - len(to_compress)} unchanged")
+    return sorted(changed)
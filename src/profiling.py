@@ -0,0 +1,120 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# bump this whenever the layout of the JSON report changes
+PROFILE_VERSION = 1
+
+class PageProfile():
+    """
+        Wall and CPU time spent in each phase of generating one page. Phases are timed back to back:
+        each call to lap() closes the phase that started at the previous lap (or at start()).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # phase name -> [wall seconds, cpu seconds]
+        self.phases = {}
+        self._wall = None
+        self._cpu = None
+
+    def start(self) -> None:
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def lap(self, phase: str) -> None:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        timings = self.phases.setdefault(phase, [0.0, 0.0])
+        timings[0] += wall - self._wall
+        timings[1] += cpu - self._cpu
+        self._wall = wall
+        self._cpu = cpu
+
+    @property
+    def wall(self) -> float:
+        return sum(timings[0] for timings in self.phases.values())
+
+    @property
+    def cpu(self) -> float:
+        return sum(timings[1] for timings in self.phases.values())
+
+
+class BuildProfiler():
+    """
+        Collects per-phase and per-page timings for a whole build. Build-wide steps (such as the static
+        sync) are timed with phase(); pages report their own PageProfile through add_page().
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.pages = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    @contextmanager
+    def phase(self, name: str):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            timings = self.phases.setdefault(name, [0.0, 0.0])
+            timings[0] += time.perf_counter() - wall
+            timings[1] += time.process_time() - cpu
+
+    def add_page(self, page_profile: PageProfile) -> None:
+        self.pages.append(page_profile)
+
+    def phase_totals(self) -> dict:
+        totals = {name: list(timings) for name, timings in self.phases.items()}
+        for page_profile in self.pages:
+            for name, (wall, cpu) in page_profile.phases.items():
+                timings = totals.setdefault(name, [0.0, 0.0])
+                timings[0] += wall
+                timings[1] += cpu
+        return totals
+
+    def slowest_pages(self, top: int = None) -> list:
+        pages = sorted(self.pages, key=lambda page_profile: page_profile.wall, reverse=True)
+        return pages if top is None else pages[:top]
+
+    def report(self, top: int = 10) -> str:
+        # with a process pool, page cpu time is spent in the workers and can exceed the build's own
+        lines = [
+            f"Build took {time.perf_counter() - self._start_wall:.3f}s wall, {time.process_time() - self._start_cpu:.3f}s cpu in the main process",
+            f"{'phase':<12} {'wall s':>10} {'cpu s':>10}",
+        ]
+        for name, (wall, cpu) in sorted(self.phase_totals().items(), key=lambda item: item[1][0], reverse=True):
+            lines.append(f"{name:<12} {wall:>10.4f} {cpu:>10.4f}")
+
+        if self.pages:
+            lines.append(f"Slowest {min(top, len(self.pages))} of {len(self.pages)} page(s):")
+            for page_profile in self.slowest_pages(top):
+                slowest_phase = max(page_profile.phases.items(), key=lambda item: item[1][0])[0]
+                lines.append(f"{page_profile.wall * 1000:>10.2f} ms  {page_profile.path} (mostly {slowest_phase})")
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        data = {
+            "version": PROFILE_VERSION,
+            "total": {
+                "wall": time.perf_counter() - self._start_wall,
+                "cpu": time.process_time() - self._start_cpu,
+            },
+            "phases": {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in self.phase_totals().items()},
+            "pages": [
+                {
+                    "path": page_profile.path,
+                    "wall": page_profile.wall,
+                    "cpu": page_profile.cpu,
+                    "phases": {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in page_profile.phases.items()},
+                }
+                for page_profile in self.slowest_pages()
+            ],
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(data, file, indent=1)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from copy_static_content import file_is_current, list_files, load_synced_files, remove_file_and_empty_dirs, save_synced_files, sync_file
+from json_manifest import save_manifest
+
+# version of the shard manifest layout, see json_manifest
+SHARD_MANIFEST_VERSION = 2
+
+# inside a shard's worker directory: the partial manifest, and the docs/ tree the shard built
+SHARD_MANIFEST_NAME = "shard-manifest.json"
+SHARD_DOCS_DIR = "docs"
+
+def parse_shard(value: str) -> tuple:
+    # "2/4" -> (2, 4): the third of four shards, counting from 0
+    index, separator, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard [{value}] must look like i/N, e.g. 0/4") from None
+    if not separator or count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard [{value}] must look like i/N with 0 <= i < N")
+    return index, count
+
+
+def shard_key(rel_source: str) -> str:
+    # shards may be built on different platforms, so paths are compared with "/" separators
+    return rel_source.replace(os.sep, "/")
+
+
+def shard_of(rel_source: str, count: int) -> int:
+    # sha256 rather than hash(), which is salted per process, so every machine agrees on the split
+    digest = hashlib.sha256(shard_key(rel_source).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def plan_digest(rel_sources) -> str:
+    # identifies the full list of pages, so merge can tell that the shards together cover all of it
+    digest = hashlib.sha256()
+    for key in sorted(shard_key(rel_source) for rel_source in rel_sources):
+        digest.update(key.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def select_shard(plan: tuple, shard: tuple) -> tuple:
+    """
+        The entries of a build plan (see build_plan.plan_site) that shard (index, count) builds. Every page
+        lands in exactly one shard, and the same page always lands in the same one.
+    """
+    index, count = shard
+    return tuple(page for page in plan if shard_of(page.rel_source, count) == index)
+
+
+class ShardManifest():
+    """
+        The partial manifest one shard writes next to its docs/ tree: which shard it is, the pages it built
+        (source -> output, relative to content/ and docs/), and the size and digest of the whole site's
+        plan along with the template digest and basepath, so merge_shards can catch shards built from
+        different trees or with different settings.
+    """
+
+    def __init__(self, index: int, count: int, pages: dict = None, plan_size: int = 0, plan_digest: str = None, template_hash: str = None, basepath: str = None):
+        self.index = index
+        self.count = count
+        self.pages = pages or {}
+        self.plan_size = plan_size
+        self.plan_digest = plan_digest
+        self.template_hash = template_hash
+        self.basepath = basepath
+
+    @classmethod
+    def load(cls, path: str) -> "ShardManifest":
+        # unlike the build manifest there's nothing to fall back to: a shard without one can't be merged
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Shard manifest [{path}] could not be read: {e}") from None
+        if not isinstance(data, dict) or data.get("version") != SHARD_MANIFEST_VERSION:
+            raise ValueError(f"Shard manifest [{path}] has version {data.get('version') if isinstance(data, dict) else None}, expected {SHARD_MANIFEST_VERSION}")
+
+        return cls(data["index"], data["count"], data.get("pages", {}), data.get("plan_size", 0), data.get("plan_digest"), data.get("template_hash"), data.get("basepath"))
+
+    def save(self, path: str) -> None:
+        save_manifest(path, SHARD_MANIFEST_VERSION, {
+            "index": self.index,
+            "count": self.count,
+            "pages": self.pages,
+            "plan_size": self.plan_size,
+            "plan_digest": self.plan_digest,
+            "template_hash": self.template_hash,
+            "basepath": self.basepath,
+        })
+
+
+def check_shards(manifests: list, worker_dirs: list) -> list:
+    # returns a description of everything that keeps the shards from adding up to one build
+    problems = []
+    counts = sorted({manifest.count for manifest in manifests})
+    if len(counts) > 1:
+        return [f"shards disagree on the shard count: {counts}"]
+    count = counts[0]
+
+    owners = {}
+    for manifest, worker_dir in zip(manifests, worker_dirs):
+        if manifest.index in owners:
+            problems.append(f"shard {manifest.index}/{count} appears in both {owners[manifest.index]} and {worker_dir}")
+        owners[manifest.index] = worker_dir
+    missing = [index for index in range(count) if index not in owners]
+    if missing:
+        problems.append(f"missing shard(s) {', '.join(f'{index}/{count}' for index in missing)}")
+
+    if len({(manifest.plan_size, manifest.plan_digest) for manifest in manifests}) > 1:
+        problems.append("shards were planned from different content/ trees")
+    if len({manifest.template_hash for manifest in manifests}) > 1:
+        problems.append("shards were built with different templates or settings")
+    basepaths = sorted({str(manifest.basepath) for manifest in manifests})
+    if len(basepaths) > 1:
+        problems.append(f"shards were built with different basepaths: {basepaths}")
+    if problems:
+        return problems
+
+    built = []
+    for manifest, worker_dir in zip(manifests, worker_dirs):
+        for rel_source in manifest.pages:
+            owner = shard_of(rel_source, count)
+            if owner != manifest.index:
+                problems.append(f"{worker_dir} built {rel_source}, which belongs to shard {owner}/{count}")
+            built.append(rel_source)
+    if len(built) != len(set(built)):
+        problems.append("some pages were built by more than one shard")
+    elif len(built) != manifests[0].plan_size or plan_digest(built) != manifests[0].plan_digest:
+        problems.append(f"the shards built {len(built)} of the site's {manifests[0].plan_size} pages")
+    return problems
+
+
+def merge_shards(worker_dirs: list, dest: str, manifest_path: str = None) -> list:
+    """
+        Combines the docs/ trees the shards built in worker_dirs into dest. First it checks that together
+        they are exactly one build: shards 0..N-1 each present once, planned from the same content/ with
+        the same template and basepath, every page built by the one shard it belongs to, every output on disk, and no
+        file produced by two shards. Shard 0 owns the static files, so the others may only hold their
+        pages (and .gz siblings). If anything is off a ValueError lists it all, before dest is touched.
+        Then only files that differ are copied, and files a previous merge (recorded in manifest_path)
+        put in dest that no shard produces any more are removed. Returns the relative paths in dest that
+        were copied or removed.
+    """
+    if len(worker_dirs) == 0:
+        raise ValueError("No shards to merge")
+
+    manifests = [ShardManifest.load(os.path.join(worker_dir, SHARD_MANIFEST_NAME)) for worker_dir in worker_dirs]
+    problems = check_shards(manifests, worker_dirs)
+
+    # rel path in dest -> the file a shard produced for it
+    sources = {}
+    for manifest, worker_dir in zip(manifests, worker_dirs):
+        docs_dir = os.path.abspath(os.path.join(worker_dir, SHARD_DOCS_DIR))
+        files = set(list_files(docs_dir)) if os.path.isdir(docs_dir) else set()
+
+        outputs = set(manifest.pages.values())
+        for rel_output in sorted(outputs - files):
+            problems.append(f"{worker_dir} is missing its output {rel_output}")
+        for rel_path in sorted(files):
+            if manifest.index != 0 and rel_path not in outputs and rel_path.removesuffix(".gz") not in outputs:
+                problems.append(f"{worker_dir} has {rel_path}, which isn't one of its pages (static files belong to shard 0)")
+            elif rel_path in sources:
+                problems.append(f"{rel_path} was produced by more than one shard")
+            else:
+                sources[rel_path] = os.path.join(docs_dir, rel_path)
+
+    if problems:
+        raise ValueError("Shards can't be merged:\n  " + "\n  ".join(problems))
+
+    dest_full = os.path.abspath(dest)
+    copied = []
+    for rel_path, src_path in sorted(sources.items()):
+        dest_path = os.path.join(dest_full, rel_path)
+        # shards are often built from scratch, so their files rarely share dest's mtimes; an identical
+        # file is left exactly as it is, or upload steps that go by mtime would send it again
+        if not file_is_current(src_path, dest_path, check_hash=True, refresh_stat=False):
+            sync_file(src_path, dest_path)
+            copied.append(rel_path)
+
+    removed = [rel_path for rel_path in load_synced_files(manifest_path) if rel_path not in sources]
+    for rel_path in removed:
+        remove_file_and_empty_dirs(dest_full, rel_path)
+    if manifest_path is not None:
+        save_synced_files(manifest_path, list(sources))
+
+    print(f"Merged {len(manifests)} shard(s): {len(copied)} copied, {len(removed)} removed, {len(sources) - len(copied)} unchanged")
+    return copied + removed
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from atomic_write import AtomicWriter, files_equal
+from test_helpers import read_file
+
+
+class TestAtomicWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "out", "index.html")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, *chunks) -> AtomicWriter:
+        with AtomicWriter(self.path) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+        return writer
+
+    def test_new_file_is_written(self):
+        self.assertTrue(self.write("<p>", "hi", "</p>").changed)
+        self.assertEqual(read_file(self.path), "<p>hi</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+    def test_identical_content_keeps_the_file(self):
+        self.write("<p>hi</p>")
+        os.utime(self.path, ns=(1, 1))
+        inode = os.stat(self.path).st_ino
+
+        self.assertFalse(self.write("<p>", "hi</p>").changed)
+        stat = os.stat(self.path)
+        self.assertEqual((stat.st_mtime_ns, stat.st_ino), (1, inode))
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+    def test_changed_content_replaces_the_file(self):
+        self.write("<p>hi</p>")
+        self.assertTrue(self.write("<p>ho</p>").changed)
+        self.assertEqual(read_file(self.path), "<p>ho</p>")
+
+    def test_error_keeps_the_old_file(self):
+        self.write("<p>hi</p>")
+        with self.assertRaises(RuntimeError):
+            with AtomicWriter(self.path) as writer:
+                writer.write("<p>half")
+                raise RuntimeError("markdown error")
+        self.assertEqual(read_file(self.path), "<p>hi</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+    def test_files_equal(self):
+        self.write("abc")
+        other = os.path.join(self.temp_dir.name, "other")
+        with open(other, 'w') as file:
+            file.write("abd")
+        self.assertFalse(files_equal(self.path, other))
+        self.assertTrue(files_equal(self.path, self.path))
+        self.assertFalse(files_equal(self.path, os.path.join(self.temp_dir.name, "missing")))
+
+
+if __name__ == "__main__":
+    unittest.main()
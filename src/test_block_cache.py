@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import block_cache
+from block_cache import BlockCache
+from textnode_helpers import BlockType, markdown_to_html_node
+
+MARKDOWN = """
+# Heading
+
+A paragraph with **bold** text
+
+- one
+- two
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache", "blocks.sqlite")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_and_put(self):
+        cache = BlockCache(self.path)
+        self.assertIsNone(cache.get("text", BlockType.PARAGRAPH))
+        cache.put("text", BlockType.PARAGRAPH, "<p>text</p>")
+        cache.close()
+
+        cache = BlockCache(self.path)
+        self.assertEqual(cache.get("text", BlockType.PARAGRAPH), "<p>text</p>")
+        # the block type is part of the key
+        self.assertIsNone(cache.get("text", BlockType.HEADING))
+        cache.close()
+
+    def test_context_is_part_of_the_key(self):
+        cache = BlockCache(self.path, context="/")
+        cache.put("text", BlockType.PARAGRAPH, "<p>text</p>")
+        cache.close()
+        cache = BlockCache(self.path, context="/site/")
+        self.assertIsNone(cache.get("text", BlockType.PARAGRAPH))
+        cache.close()
+
+    def test_cached_render_matches_uncached(self):
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+
+        cache = BlockCache(self.path)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, block_cache=cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        cache.flush()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, block_cache=cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+        cache.close()
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(self.path, max_bytes=25)
+        with mock.patch("time.time_ns", return_value=1):
+            cache.put("old", BlockType.PARAGRAPH, "<p>old block</p>")
+            cache.flush()
+        with mock.patch("time.time_ns", return_value=2):
+            cache.put("new", BlockType.PARAGRAPH, "<p>new block</p>")
+            cache.flush()
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get("old", BlockType.PARAGRAPH))
+        self.assertEqual(cache.get("new", BlockType.PARAGRAPH), "<p>new block</p>")
+        cache.close()
+
+    def test_version_change_discards_entries(self):
+        cache = BlockCache(self.path)
+        cache.put("text", BlockType.PARAGRAPH, "<p>text</p>")
+        cache.close()
+
+        with mock.patch.object(block_cache, "CACHE_FORMAT_VERSION", block_cache.CACHE_FORMAT_VERSION + 1):
+            cache = BlockCache(self.path)
+            self.assertIsNone(cache.get("text", BlockType.PARAGRAPH))
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
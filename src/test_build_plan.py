@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from build_plan import PlannedPage, is_page, plan_site
+from test_helpers import write_file
+
+
+class TestPlanSite(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.content = os.path.join(root, "content")
+        self.dest = os.path.join(root, "docs")
+
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom")
+        write_file(os.path.join(self.content, "blog", "glorfindel", "index.MD"), "# Glorfindel")
+        write_file(os.path.join(self.content, "blog", "tom", "photo.png"), "png bytes")
+        write_file(os.path.join(self.content, "notes.md", "draft.txt"), "a directory, not a page")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_plan_lists_pages_sorted(self):
+        plan = plan_site(self.content, self.dest)
+        self.assertIsInstance(plan, tuple)
+        self.assertEqual(
+            [page.rel_source for page in plan],
+            sorted([os.path.join("blog", "glorfindel", "index.MD"), os.path.join("blog", "tom", "index.md"), "index.md"]),
+        )
+
+    def test_entries_carry_paths_and_stat(self):
+        page = {page.rel_source: page for page in plan_site(self.content, self.dest)}[os.path.join("blog", "tom", "index.md")]
+        self.assertIsInstance(page, PlannedPage)
+        self.assertEqual(page.rel_output, os.path.join("blog", "tom", "index.html"))
+        self.assertEqual(page.source, os.path.join(os.path.abspath(self.content), "blog", "tom", "index.md"))
+        self.assertEqual(page.dest, os.path.join(os.path.abspath(self.dest), "blog", "tom", "index.html"))
+        self.assertEqual(page.stat.st_size, len("# Tom"))
+        self.assertEqual(page.stat.st_mtime_ns, os.stat(page.source).st_mtime_ns)
+
+    def test_entries_are_immutable(self):
+        page = plan_site(self.content, self.dest)[0]
+        with self.assertRaises(AttributeError):
+            page.dest = "elsewhere"
+
+    def test_is_page(self):
+        self.assertTrue(is_page("post.md"))
+        self.assertTrue(is_page(os.path.join("blog", "POST.MD")))
+        self.assertFalse(is_page(".md"))
+        self.assertFalse(is_page("post.markdown"))
+
+
+if __name__ == "__main__":
+    unittest.main()
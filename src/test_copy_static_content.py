@@ -0,0 +1,185 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from copy_static_content import copy_static_content, fingerprinted_path, list_files, load_asset_urls, remove_tree, sync_static_content, walk_tree
+from test_helpers import read_file, write_file
+
+
+class TestCopyStaticContent(unittest.TestCase):
+    def test_missing_source_raises(self):
+        with tempfile.TemporaryDirectory() as root:
+            with self.assertRaises(ValueError):
+                copy_static_content(os.path.join(root, "missing"), os.path.join(root, "docs"))
+
+    def test_copies_tree_and_replaces_dest(self):
+        with tempfile.TemporaryDirectory() as root:
+            static = os.path.join(root, "static")
+            dest = os.path.join(root, "docs")
+            write_file(os.path.join(static, "index.css"), "body {}")
+            write_file(os.path.join(static, "images", "tom.png"), "png bytes")
+            os.makedirs(os.path.join(static, "empty"))
+            write_file(os.path.join(dest, "stale.txt"), "old")
+
+            copy_static_content(static, dest)
+            self.assertEqual(read_file(os.path.join(dest, "images", "tom.png")), "png bytes")
+            self.assertTrue(os.path.isdir(os.path.join(dest, "empty")))
+            self.assertFalse(os.path.exists(os.path.join(dest, "stale.txt")))
+
+
+class TestWalkTree(unittest.TestCase):
+    def test_directories_come_before_their_contents(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_file(os.path.join(root, "a", "b", "c.txt"), "c")
+            write_file(os.path.join(root, "d.txt"), "d")
+            rel_paths = [rel_path for rel_path, _ in walk_tree(root)]
+            self.assertEqual(sorted(rel_paths), sorted(["a", os.path.join("a", "b"), os.path.join("a", "b", "c.txt"), "d.txt"]))
+            self.assertLess(rel_paths.index("a"), rel_paths.index(os.path.join("a", "b")))
+            self.assertLess(rel_paths.index(os.path.join("a", "b")), rel_paths.index(os.path.join("a", "b", "c.txt")))
+
+    def test_deeper_than_the_recursion_limit(self):
+        depth = 1200
+        with tempfile.TemporaryDirectory() as root:
+            tree = os.path.join(root, "tree")
+            # os.makedirs recurses once per level too
+            path = tree
+            os.mkdir(path)
+            for _ in range(depth):
+                path = os.path.join(path, "d")
+                os.mkdir(path)
+            write_file(os.path.join(path, "f"), "x")
+            self.assertEqual(list_files(tree), [os.path.join(*["d"] * depth, "f")])
+            remove_tree(tree)
+            self.assertFalse(os.path.exists(tree))
+
+    def test_remove_tree_does_not_follow_symlinks(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_file(os.path.join(root, "kept", "file.txt"), "kept")
+            write_file(os.path.join(root, "tree", "file.txt"), "gone")
+            os.symlink(os.path.join(root, "kept"), os.path.join(root, "tree", "link"))
+            remove_tree(os.path.join(root, "tree"))
+            self.assertFalse(os.path.exists(os.path.join(root, "tree")))
+            self.assertEqual(read_file(os.path.join(root, "kept", "file.txt")), "kept")
+
+
+class TestSyncStaticContent(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.static = os.path.join(root, "static")
+        self.dest = os.path.join(root, "docs")
+        self.manifest = os.path.join(root, ".cache", "static-manifest.json")
+
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "tom.png"), "png bytes")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def sync(self, **kwargs) -> list:
+        with redirect_stdout(io.StringIO()):
+            return sync_static_content(self.static, self.dest, manifest_path=self.manifest, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        changed = self.sync()
+        self.assertEqual(sorted(changed), ["images/tom.png", "index.css"])
+        self.assertEqual(read_file(os.path.join(self.dest, "images", "tom.png")), "png bytes")
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        self.assertEqual(self.sync(), [])
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        write_file(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.assertEqual(self.sync(), ["index.css"])
+        self.assertEqual(read_file(os.path.join(self.dest, "index.css")), "body { color: red; }")
+
+    def test_generated_files_are_left_alone(self):
+        write_file(os.path.join(self.dest, "index.html"), "<html></html>")
+        self.sync()
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_deleted_source_is_removed(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "tom.png"))
+        self.assertEqual(self.sync(), ["images/tom.png"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_hash_check_skips_touched_file(self):
+        self.sync()
+        css_path = os.path.join(self.static, "index.css")
+        os.utime(css_path, ns=(0, 0))
+        self.assertEqual(self.sync(check_hash=True), [])
+        self.assertEqual(self.sync(), [])
+
+    def test_hardlink_mode(self):
+        self.sync(link=True)
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"), os.path.join(self.dest, "index.css")))
+
+        # switching back to copies must not write through the old link into static/
+        write_file(os.path.join(self.static, "images", "tom.png"), "new png bytes")
+        self.sync(link=False)
+        self.assertEqual(read_file(os.path.join(self.static, "images", "tom.png")), "new png bytes")
+
+
+class TestFingerprintedSync(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.static = os.path.join(root, "static")
+        self.dest = os.path.join(root, "docs")
+        self.manifest = os.path.join(root, ".cache", "static-manifest.json")
+        self.asset_manifest = os.path.join(root, ".cache", "asset-manifest.json")
+
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "tom.png"), "png bytes")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def sync(self) -> list:
+        with redirect_stdout(io.StringIO()):
+            return sync_static_content(self.static, self.dest, manifest_path=self.manifest, asset_manifest_path=self.asset_manifest)
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path("images/tom.png", "0123456789abcdef"), "images/tom.0123456789ab.png")
+
+    def test_files_are_copied_under_hashed_names(self):
+        changed = self.sync()
+        urls = load_asset_urls(self.asset_manifest)
+        self.assertEqual(sorted(urls), ["images/tom.png", "index.css"])
+        self.assertEqual(sorted(changed), sorted(urls.values()))
+        self.assertRegex(urls["images/tom.png"], r"^images/tom\.[0-9a-f]{12}\.png$")
+        self.assertEqual(read_file(os.path.join(self.dest, urls["images/tom.png"])), "png bytes")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "tom.png")))
+
+    def test_well_known_files_keep_their_names(self):
+        for rel_path in ("CNAME", "robots.txt", ".nojekyll", "favicon.ico"):
+            write_file(os.path.join(self.static, rel_path), "kept")
+        self.sync()
+        self.assertEqual(sorted(load_asset_urls(self.asset_manifest)), ["images/tom.png", "index.css"])
+        for rel_path in ("CNAME", "robots.txt", ".nojekyll", "favicon.ico"):
+            self.assertEqual(read_file(os.path.join(self.dest, rel_path)), "kept")
+
+    def test_changed_content_replaces_old_hashed_name(self):
+        self.sync()
+        old_name = load_asset_urls(self.asset_manifest)["index.css"]
+        write_file(os.path.join(self.static, "index.css"), "body { color: red; }")
+        changed = self.sync()
+
+        new_name = load_asset_urls(self.asset_manifest)["index.css"]
+        self.assertNotEqual(new_name, old_name)
+        self.assertEqual(sorted(changed), sorted([new_name, old_name]))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old_name)))
+        self.assertEqual(read_file(os.path.join(self.dest, new_name)), "body { color: red; }")
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        self.assertEqual(self.sync(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from dependency_graph import (
+    BASEPATH_INPUT,
+    TEMPLATE_INPUT,
+    DependencyGraph,
+    asset_for_url,
+    asset_input,
+    local_references,
+    page_inputs,
+    source_input
+)
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.set_dependencies("index.html", [TEMPLATE_INPUT, source_input("index.md"), asset_input("images/tom.png")])
+        self.graph.set_dependencies("post/index.html", [TEMPLATE_INPUT, source_input("post/index.md")])
+
+    def test_dirty_outputs(self):
+        self.assertEqual(self.graph.dirty_outputs({TEMPLATE_INPUT}), {"index.html", "post/index.html"})
+        self.assertEqual(self.graph.dirty_outputs({asset_input("images/tom.png")}), {"index.html"})
+        self.assertEqual(self.graph.dirty_outputs({source_input("post/index.md")}), {"post/index.html"})
+        self.assertEqual(self.graph.dirty_outputs({asset_input("images/other.png")}), set())
+
+    def test_set_dependencies_replaces_old_edges(self):
+        self.graph.set_dependencies("index.html", [TEMPLATE_INPUT, source_input("index.md")])
+        self.assertEqual(self.graph.dirty_outputs({asset_input("images/tom.png")}), set())
+        self.assertEqual(self.graph.assets(), [])
+
+    def test_remove_output(self):
+        self.graph.remove_output("index.html")
+        self.assertEqual(self.graph.inputs(), {TEMPLATE_INPUT, source_input("post/index.md")})
+        self.graph.remove_output("missing.html")
+
+    def test_round_trip(self):
+        graph = DependencyGraph.from_dict(self.graph.to_dict())
+        self.assertEqual(graph.dependencies, self.graph.dependencies)
+        self.assertEqual(graph.dependents, self.graph.dependents)
+
+
+class TestPageInputs(unittest.TestCase):
+    def test_local_references(self):
+        markdown = "![Tom](/images/tom.png) [home](/) [out](https://example.com) [cdn](//cdn.example.com/a.js) [again](/images/tom.png)"
+        self.assertEqual(local_references(markdown), ["/images/tom.png", "/"])
+
+    def test_local_references_on_a_link_dense_page(self):
+        # tens of thousands of distinct links, each repeated, in a single paragraph
+        urls = [f"/blog/post-{index}" for index in range(40000)]
+        markdown = " ".join(f"[post {index}]({url}) and [again]({url})" for index, url in enumerate(urls))
+        self.assertEqual(local_references(markdown), urls)
+
+    def test_page_inputs_only_include_existing_assets(self):
+        with tempfile.TemporaryDirectory() as static_dir:
+            os.makedirs(os.path.join(static_dir, "images"))
+            with open(os.path.join(static_dir, "images", "tom.png"), 'w') as file:
+                file.write("png")
+
+            self.assertEqual(asset_for_url("/images/tom.png?v=2#top", static_dir), os.path.join("images", "tom.png"))
+            self.assertIsNone(asset_for_url("/../secret", static_dir))
+            self.assertEqual(
+                page_inputs("index.md", ["/images/tom.png", "/blog/post", "/"], static_dir),
+                [TEMPLATE_INPUT, BASEPATH_INPUT, source_input("index.md"), asset_input(os.path.join("images", "tom.png"))],
+            )
+            self.assertEqual(page_inputs("index.md", ["/images/tom.png"]), [TEMPLATE_INPUT, BASEPATH_INPUT, source_input("index.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
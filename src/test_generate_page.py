@@ -0,0 +1,230 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from generate_page import generate_pages_recursive
+from test_helpers import read_file, write_file
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestGeneratePagesIncremental(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.content = os.path.join(root, "content")
+        self.dest = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.static = os.path.join(root, "static")
+        self.manifest = os.path.join(root, ".cache", "build-manifest.json")
+
+        write_file(self.template, TEMPLATE)
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **home**")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nA post")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def build(self, basepath: str = "/") -> str:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            generate_pages_recursive(basepath, self.content, self.template, self.dest, manifest_path=self.manifest, static_dir=self.static)
+        return output.getvalue()
+
+    def test_first_build_generates_everything(self):
+        log = self.build()
+        self.assertEqual(log.count("Generating page"), 2)
+        self.assertTrue(os.path.exists(self.manifest))
+        self.assertEqual(
+            read_file(os.path.join(self.dest, "index.html")),
+            "<html><title>Home</title><body><div><h1>Home</h1><p>Welcome <b>home</b></p></div></body></html>",
+        )
+
+    def test_unchanged_build_skips_pages(self):
+        self.build()
+        log = self.build()
+        self.assertNotIn("Generating page", log)
+        self.assertIn("Skipped 2 unchanged page(s)", log)
+
+    def test_edited_source_is_rebuilt(self):
+        self.build()
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nEdited")
+        log = self.build()
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertIn("Edited", read_file(os.path.join(self.dest, "index.html")))
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "blog", "post", "index.html"))
+        log = self.build()
+        self.assertEqual(log.count("Generating page"), 1)
+
+    def test_template_or_basepath_change_rebuilds_everything(self):
+        self.build()
+        write_file(self.template, TEMPLATE + "\n")
+        self.assertEqual(self.build().count("Generating page"), 2)
+        self.assertEqual(self.build("/site/").count("Generating page"), 2)
+
+    def test_renderer_change_rebuilds_everything(self):
+        self.build()
+        with mock.patch("generate_page.renderer_fingerprint", return_value="edited renderer"):
+            self.assertEqual(self.build().count("Generating page"), 2)
+            self.assertIn("Skipped 2 unchanged page(s)", self.build())
+
+    def test_minify_toggle_rebuilds_everything(self):
+        self.build()
+        with redirect_stdout(io.StringIO()) as output:
+            generate_pages_recursive("/", self.content, self.template, self.dest, manifest_path=self.manifest, static_dir=self.static, minify=True)
+        self.assertEqual(output.getvalue().count("Generating page"), 2)
+        self.assertEqual(read_file(os.path.join(self.dest, "blog", "post", "index.html")),
+                         "<html><title>Post</title><body><div><h1>Post</h1><p>A post</p></div></body></html>")
+        self.assertEqual(self.build().count("Generating page"), 2)
+
+    def test_asset_change_rebuilds_only_pages_that_reference_it(self):
+        write_file(os.path.join(self.static, "images", "tom.png"), "v1")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\n![Tom](/images/tom.png)")
+        self.build()
+
+        write_file(os.path.join(self.static, "images", "tom.png"), "v2")
+        log = self.build()
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertIn(os.path.join("blog", "post", "index.md"), log)
+        # an unrelated asset doesn't rebuild anything
+        write_file(os.path.join(self.static, "images", "other.png"), "v1")
+        self.assertNotIn("Generating page", self.build())
+
+    def test_deleted_asset_rebuilds_pages_that_reference_it(self):
+        write_file(os.path.join(self.static, "images", "tom.png"), "v1")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[Tom](/images/tom.png)")
+        self.build()
+
+        os.remove(os.path.join(self.static, "images", "tom.png"))
+        self.assertEqual(self.build().count("Generating page"), 1)
+        self.assertNotIn("Generating page", self.build())
+
+    def test_identical_output_is_not_rewritten(self):
+        self.build()
+        output = os.path.join(self.dest, "index.html")
+        os.utime(output, ns=(1, 1))
+
+        # losing the manifest forces every page to be regenerated, but none of them change
+        os.remove(self.manifest)
+        with redirect_stdout(io.StringIO()):
+            changed = generate_pages_recursive("/", self.content, self.template, self.dest, manifest_path=self.manifest)
+        self.assertEqual(changed, [])
+        self.assertEqual(os.stat(output).st_mtime_ns, 1)
+
+    def test_changed_outputs_are_returned(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nEdited")
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(
+                generate_pages_recursive("/", self.content, self.template, self.dest, manifest_path=self.manifest),
+                [os.path.join("blog", "post", "index.html"), "index.html"],
+            )
+            write_file(os.path.join(self.content, "index.md"), "# Home\n\nEdited again")
+            os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+            self.assertEqual(
+                generate_pages_recursive("/", self.content, self.template, self.dest, manifest_path=self.manifest),
+                [os.path.join("blog", "post", "index.html"), "index.html"],
+            )
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post", "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+
+class TestGeneratePageBasepath(unittest.TestCase):
+    def test_basepath_applies_to_urls_but_not_code_samples(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            write_file(template, '<link href="/index.css" />{{ Content }}')
+            write_file(os.path.join(content, "index.md"),
+                       '# Home\n\n[blog](/blog) ![logo](/logo.png) `<a href="/x">`\n\n```\n<img src="/y.png">\n```')
+
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive("/site/", content, template, os.path.join(root, "docs"))
+
+            self.assertEqual(
+                read_file(os.path.join(root, "docs", "index.html")),
+                '<link href="/site/index.css" /><div><h1>Home</h1><p><a href="/site/blog">blog</a><img src="/site/logo.png" alt="logo"></img>'
+                '<code>&lt;a href="/x"&gt;</code></p><pre><code>&lt;img src="/y.png"&gt;\n</code></pre></div>',
+            )
+
+    def test_fingerprinted_assets_are_linked_by_hashed_name(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            write_file(template, '<link href="/index.css" />{{ Content }}')
+            write_file(os.path.join(content, "index.md"), '# Home\n\n![logo](/logo.png?v=2) [blog](/blog)')
+            assets = {"index.css": "index.0123456789ab.css", "logo.png": "logo.ba9876543210.png"}
+
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive("/site/", content, template, os.path.join(root, "docs"), assets=assets)
+
+            self.assertEqual(
+                read_file(os.path.join(root, "docs", "index.html")),
+                '<link href="/site/index.0123456789ab.css" /><div><h1>Home</h1><p><img src="/site/logo.ba9876543210.png?v=2" alt="logo"></img>'
+                '<a href="/site/blog">blog</a></p></div>',
+            )
+
+
+class TestGenerateLargePage(unittest.TestCase):
+    MARKDOWN = "Intro\n\n# Title\n\n[home](/index.html) and ![img](/a.png)\n\n\n\n- one\n- **two**\n\n```\ncode\nmore\n```\n"
+
+    def build(self, root: str, dest: str, threshold: int) -> None:
+        with mock.patch("generate_page.STREAM_THRESHOLD", threshold), redirect_stdout(io.StringIO()):
+            generate_pages_recursive("/site/", os.path.join(root, "content"), os.path.join(root, "template.html"), os.path.join(root, dest))
+
+    def test_streamed_page_matches_whole_file_page(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_file(os.path.join(root, "template.html"), TEMPLATE)
+            write_file(os.path.join(root, "content", "index.md"), self.MARKDOWN)
+
+            self.build(root, "whole", threshold=1 << 30)
+            self.build(root, "streamed", threshold=0)
+            self.assertEqual(
+                read_file(os.path.join(root, "streamed", "index.html")),
+                read_file(os.path.join(root, "whole", "index.html")),
+            )
+
+    def test_streamed_page_error_leaves_no_partial_output(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_file(os.path.join(root, "template.html"), TEMPLATE)
+            write_file(os.path.join(root, "content", "index.md"), "# Title\n\nfine\n\nunclosed **bold\n")
+
+            with self.assertRaises(SyntaxError):
+                self.build(root, "docs", threshold=0)
+            self.assertFalse(os.path.exists(os.path.join(root, "docs", "index.html")))
+
+
+class TestGeneratePagesParallel(unittest.TestCase):
+    def test_parallel_output_matches_serial(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            write_file(template, TEMPLATE)
+            for index in range(6):
+                write_file(os.path.join(content, f"post{index}", "index.md"), f"# Post {index}\n\n- item **{index}**")
+
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive("/", content, template, os.path.join(root, "serial"))
+                generate_pages_recursive("/", content, template, os.path.join(root, "parallel"), jobs=3)
+
+            for index in range(6):
+                rel_output = os.path.join(f"post{index}", "index.html")
+                self.assertEqual(
+                    read_file(os.path.join(root, "serial", rel_output)),
+                    read_file(os.path.join(root, "parallel", rel_output)),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+"""
+    File helpers shared by the tests that build sites in a temporary directory. Not a test module
+    itself: it holds no TestCases, so discovery imports it and finds nothing to run.
+"""
+import os
+
+def write_file(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(content)
+
+def read_file(path: str) -> str:
+    with open(path, 'r') as file:
+        return file.read()
+
+def read_tree(root: str) -> dict:
+    # relative path -> content of every file under root
+    tree = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            tree[os.path.relpath(path, root)] = read_file(path)
+    return tree
@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawNode, escape_attribute, escape_text
 
 class TestHTMLNode(unittest.TestCase):
     def test_htmlnode_create_empty(self):
@@ -49,6 +49,28 @@ class TestHTMLNode(unittest.TestCase):
             ' href="https://www.google.com" target="_blank"', html_node.props_to_html()
         )
 
+    def test_props_to_html_escapes_values(self):
+        html_node = HTMLNode("img", None, None, {"src": "/a.png?x=1&y=2", "alt": 'say "<hi>"'})
+        self.assertEqual(
+            ' src="/a.png?x=1&amp;y=2" alt="say &quot;&lt;hi&gt;&quot;"', html_node.props_to_html()
+        )
+
+    def test_props_to_html_reuses_attribute_strings(self):
+        first = HTMLNode("a", None, None, {"href": "/blog"}).props_to_html()
+        second = HTMLNode("a", None, None, {"href": "/blog"}).props_to_html()
+        self.assertIs(first, second)
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a < b && "c" > d'), 'a &lt; b &amp;&amp; "c" &gt; d')
+
+    def test_clean_text_is_returned_as_is(self):
+        text = "nothing to see here"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute('"&<>'), "&quot;&amp;&lt;&gt;")
+
 class TestLeafNode(unittest.TestCase):
     def test_leafnode_create_empty(self):
         leaf_node = LeafNode()
@@ -80,6 +102,37 @@ class TestLeafNode(unittest.TestCase):
        leaf_node = LeafNode("a", "Click me!", {"href": "https://www.google.com"})
        self.assertEqual(leaf_node.to_html(), '<a href="https://www.google.com">Click me!</a>')
 
+    def test_leafnode_escapes_value(self):
+        self.assertEqual(LeafNode("code", "if a < b && c > d:").to_html(), "<code>if a &lt; b &amp;&amp; c &gt; d:</code>")
+        self.assertEqual(LeafNode(None, "< Back").to_html(), "&lt; Back")
+        # the value itself is left as written
+        self.assertEqual(LeafNode(None, "< Back").value, "< Back")
+
+    def test_leafnode_value_assigned_later(self):
+        leaf_node = LeafNode("b", "a < b")
+        self.assertEqual(leaf_node.to_html(), "<b>a &lt; b</b>")
+        leaf_node.value = "b > a"
+        self.assertEqual(leaf_node.to_html(), "<b>b &gt; a</b>")
+
+        leaf_node = LeafNode("b", None)
+        with self.assertRaises(ValueError):
+            leaf_node.to_html()
+        leaf_node.value = "set & rendered"
+        self.assertEqual(leaf_node.to_html(), "<b>set &amp; rendered</b>")
+
+    def test_leafnode_props_changed_after_rendering(self):
+        leaf_node = LeafNode("a", "Blog", {"href": "/blog"})
+        self.assertEqual(leaf_node.to_html(), '<a href="/blog">Blog</a>')
+        leaf_node.props["href"] = "/blog?a&b"
+        self.assertEqual(leaf_node.to_html(), '<a href="/blog?a&amp;b">Blog</a>')
+        leaf_node.props = {"href": "/tags", "class": "nav"}
+        self.assertEqual(leaf_node.to_html(), '<a href="/tags" class="nav">Blog</a>')
+        leaf_node.props = None
+        self.assertEqual(leaf_node.to_html(), '<a>Blog</a>')
+
+    def test_rawnode_is_not_escaped(self):
+        self.assertEqual(RawNode("<p>a &amp; b</p>").to_html(), "<p>a &amp; b</p>")
+
 class TestParentNode(unittest.TestCase):
     def test_parentnode_create_empty_errors(self):
         with self.assertRaises(TypeError):
@@ -142,6 +195,40 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_render_streams_chunks(self):
+        parent_node = ParentNode("div", [ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")])], {"class": "post"})
+        chunks = []
+        parent_node.render(chunks.append)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), '<div class="post"><p><b>bold</b> text</p></div>')
+        self.assertEqual(chunks, list(parent_node.iter_html()))
+        self.assertEqual(parent_node.to_html(), "".join(chunks))
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "bold"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_iter_html_validates_tag(self):
+        parent_node = ParentNode("", [LeafNode(None, "text")])
+        with self.assertRaises(ValueError):
+            list(parent_node.iter_html())
+
+    def test_nested_child_is_validated(self):
+        parent_node = ParentNode("div", [LeafNode(None, "a"), ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            parent_node.to_html()
+        with self.assertRaises(ValueError):
+            list(parent_node.iter_html())
+
+    def test_deeper_than_the_recursion_limit(self):
+        depth = 5000
+        node = LeafNode("b", "x")
+        for _ in range(depth):
+            node = ParentNode("i", [node, LeafNode(None, ".")])
+        expected = "<i>" * depth + "<b>x</b>" + "." + "</i>." * (depth - 1) + "</i>"
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual("".join(node.iter_html()), expected)
+
     
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
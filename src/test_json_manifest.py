@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+
+from json_manifest import load_manifest, save_manifest
+from test_helpers import write_file
+
+
+class TestJsonManifest(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, ".cache", "manifest.json")
+            save_manifest(path, 3, {"files": ["a", "b"]})
+            self.assertEqual(load_manifest(path, 3), {"version": 3, "files": ["a", "b"]})
+            self.assertFalse(os.path.exists(f"{path}.tmp"))
+
+    def test_missing_outdated_or_unreadable(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "manifest.json")
+            self.assertIsNone(load_manifest(None, 1))
+            self.assertIsNone(load_manifest(path, 1))
+            save_manifest(path, 1, {})
+            self.assertIsNone(load_manifest(path, 2))
+            write_file(path, "{not json")
+            self.assertIsNone(load_manifest(path, 1))
+            write_file(path, "[1]")
+            self.assertIsNone(load_manifest(path, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import io
 import unittest
+from contextlib import redirect_stderr
 
 from main import *
 from textnode import TextNode, TextType
@@ -8,5 +10,21 @@ class TestTextNodeToHMLNode(unittest.TestCase):
     pass
 
 
+class TestParseArgs(unittest.TestCase):
+    def test_shard(self):
+        self.assertEqual(parse_args(["/site/", "--shard", "1/4"]).shard, (1, 4))
+        self.assertIsNone(parse_args([]).shard)
+
+    def test_bad_shard_and_watch_with_shard_are_rejected(self):
+        for argv in (["--shard", "4/4"], ["--shard", "1/4", "--watch"]):
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                parse_args(argv)
+
+    def test_merge_args(self):
+        args = parse_merge_args([".shards/0", ".shards/1", "--dest", "public"])
+        self.assertEqual(args.worker_dirs, [".shards/0", ".shards/1"])
+        self.assertEqual(args.dest, "public")
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+
+import minify
+from minify import HTMLMinifier, minify_start_tag
+
+def minified(html: str, step: int = None) -> str:
+    chunks = []
+    minifier = HTMLMinifier(chunks.append)
+    step = step or max(1, len(html))
+    for index in range(0, len(html), step):
+        minifier.write(html[index:index + step])
+    minifier.close()
+    return "".join(chunks)
+
+
+class TestMinifyStartTag(unittest.TestCase):
+    def test_optional_quotes_are_dropped(self):
+        self.assertEqual(minify_start_tag('<a  href="/blog"\n title="Two words">', "a"), '<a href=/blog title="Two words">')
+
+    def test_values_that_need_quotes_keep_them(self):
+        self.assertEqual(minify_start_tag('<img alt="" src="a=b">', "img"), '<img alt="" src="a=b">')
+        self.assertEqual(minify_start_tag("<img alt='say \"hi\"'>", "img"), "<img alt='say \"hi\"'>")
+
+    def test_void_elements_lose_the_trailing_slash(self):
+        self.assertEqual(minify_start_tag('<link href="/index.css" rel="stylesheet" />', "link"), "<link href=/index.css rel=stylesheet>")
+        self.assertEqual(minify_start_tag('<div class="x" />', "div"), "<div class=x />")
+
+    def test_unparseable_tag_is_unchanged(self):
+        self.assertEqual(minify_start_tag('<a href="x"title="y">', "a"), '<a href="x"title="y">')
+
+
+class TestHTMLMinifier(unittest.TestCase):
+    def test_whitespace_and_comments(self):
+        html = '<!doctype html>\n<html>\n  <head>\n    <title> Home </title>\n  </head>\n  <!-- nav -->\n  <body>\n    <p>Some  <b>bold</b>\n text</p>\n  </body>\n</html>\n'
+        self.assertEqual(
+            minified(html),
+            "<!doctype html><html><head><title>Home</title></head><body><p>Some <b>bold</b> text</p></body></html>",
+        )
+
+    def test_pre_and_code_are_verbatim(self):
+        html = '<div>\n  <pre><code>a  =  1\n\n  b\n</code></pre>\n  <p>use <code>x  y</code>  here</p>\n</div>'
+        self.assertEqual(minified(html), "<div><pre><code>a  =  1\n\n  b\n</code></pre><p>use <code>x  y</code> here</p></div>")
+
+    def test_tags_inside_comments_are_dropped_with_them(self):
+        self.assertEqual(minified("<p>a <!-- <pre> -->  b</p>"), "<p>a b</p>")
+
+    def test_less_than_that_is_not_a_tag(self):
+        self.assertEqual(minified('<p><a href="/">< Back</a> 1 < 2</p>'), "<p><a href=/>< Back</a> 1 < 2</p>")
+
+    def test_non_breaking_spaces_are_kept(self):
+        self.assertEqual(minified("<p>a  b</p>"), "<p>a  b</p>")
+
+    def test_output_does_not_depend_on_chunking(self):
+        html = '<html>\n <body>\n  <!-- a > b -->\n  <p title="1 > 0">x  <i>y</i>\n</p>\n  <pre>  keep\n  this </pre>\n </body>\n</html>'
+        expected = minified(html)
+        with mock.patch.object(minify, "MINIFY_BUFFER_SIZE", 1):
+            for step in (1, 2, 3, 5, 8):
+                self.assertEqual(minified(html, step), expected, step)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from page_template import PageTemplate, rewrite_basepath
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css" /><article>{{ Content }}</article><img src="/logo.png" />'
+
+
+class TestRewriteBasepath(unittest.TestCase):
+    def test_rewrites_href_and_src(self):
+        self.assertEqual(
+            rewrite_basepath('<a href="/blog"><img src="/a.png"></a>', "/site/"),
+            '<a href="/site/blog"><img src="/site/a.png"></a>',
+        )
+
+    def test_protocol_relative_urls_are_unchanged(self):
+        html = '<script src="//cdn.example.com/a.js"></script>'
+        self.assertEqual(rewrite_basepath(html, "/site/"), html)
+
+    def test_root_basepath_is_unchanged(self):
+        html = '<a href="/blog">blog</a>'
+        self.assertEqual(rewrite_basepath(html, "/"), html)
+
+
+class TestPageTemplate(unittest.TestCase):
+    def test_render(self):
+        template = PageTemplate(TEMPLATE)
+        self.assertEqual(
+            template.render("Home", "<p>hi</p>"),
+            '<title>Home</title><link href="/index.css" /><article><p>hi</p></article><img src="/logo.png" />',
+        )
+
+    def test_basepath_applied_at_compile_time(self):
+        template = PageTemplate(TEMPLATE, "/ss-generator/")
+        self.assertEqual(
+            template.render("Home", '<a href="/x">x</a>'),
+            '<title>Home</title><link href="/ss-generator/index.css" /><article><a href="/x">x</a></article><img src="/ss-generator/logo.png" />',
+        )
+
+    def test_repeated_and_missing_slots(self):
+        self.assertEqual(PageTemplate("{{ Title }} - {{ Title }}").render("T", "C"), "T - T")
+        self.assertEqual(PageTemplate("static").render("T", "C"), "static")
+
+    def test_title_is_escaped(self):
+        self.assertEqual(PageTemplate("<title>{{ Title }}</title>").render("Q&A <draft>", ""), "<title>Q&amp;A &lt;draft&gt;</title>")
+
+    def test_slot_values_are_not_substituted_again(self):
+        template = PageTemplate("{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render("T", "{{ Title }}"), "T|{{ Title }}")
+
+    def test_digest_tracks_template_text(self):
+        self.assertEqual(PageTemplate(TEMPLATE).digest, PageTemplate(TEMPLATE, "/site/").digest)
+        self.assertNotEqual(PageTemplate(TEMPLATE).digest, PageTemplate(TEMPLATE + " ").digest)
+
+    def test_fingerprinted_assets_applied_at_compile_time(self):
+        assets = {"index.css": "index.0123456789ab.css"}
+        template = PageTemplate(TEMPLATE, "/site/", assets)
+        self.assertIn('<link href="/site/index.0123456789ab.css" />', template.render("Home", ""))
+        self.assertIn('<img src="/site/logo.png" />', template.render("Home", ""))
+        # a new fingerprint for the stylesheet changes every page
+        self.assertNotEqual(template.digest, PageTemplate(TEMPLATE, "/site/").digest)
+        self.assertNotEqual(template.digest, PageTemplate(TEMPLATE, "/site/", {"index.css": "index.ba9876543210.css"}).digest)
+
+    def test_minified_stream(self):
+        text = "<html>\n  <title>{{ Title }}</title>\n  <body>{{ Content }}</body>\n</html>"
+        template = PageTemplate(text, minify=True)
+        chunks = []
+        template.stream(chunks.append, "Home", lambda write: write('<p>\n  <a href="/x">x</a>\n</p>'))
+        self.assertEqual("".join(chunks), "<html><title>Home</title><body><p><a href=/x>x</a></p></body></html>")
+        self.assertNotEqual(template.digest, PageTemplate(text).digest)
+
+    def test_load_missing_file(self):
+        with self.assertRaises(ValueError):
+            PageTemplate.load("/nonexistent/template.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
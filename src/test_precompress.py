@@ -0,0 +1,91 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from precompress import compress_file, precompress_outputs
+from test_helpers import write_file
+
+# repetitive enough to shrink well
+PAGE = "<p>" + "the ring bearer walked through rivendell " * 100 + "</p>"
+
+
+class TestCompressFile(unittest.TestCase):
+    def test_compresses_and_is_reproducible(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "index.html")
+            write_file(path, PAGE)
+            self.assertTrue(compress_file(path))
+            with open(f"{path}.gz", 'rb') as file:
+                first = file.read()
+            self.assertEqual(gzip.decompress(first).decode(), PAGE)
+
+            self.assertTrue(compress_file(path))
+            with open(f"{path}.gz", 'rb') as file:
+                self.assertEqual(file.read(), first)
+
+    def test_small_or_incompressible_files_are_skipped(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "index.html")
+            write_file(path, PAGE)
+            compress_file(path)
+
+            # shrinking below the threshold removes the old sibling
+            write_file(path, "<p>hi</p>")
+            self.assertFalse(compress_file(path))
+            self.assertFalse(os.path.exists(f"{path}.gz"))
+
+            noise = os.path.join(root, "noise.txt")
+            with open(noise, 'wb') as file:
+                file.write(os.urandom(4096))
+            self.assertFalse(compress_file(noise))
+            self.assertEqual(sorted(os.listdir(root)), ["index.html", "noise.txt"])
+
+
+class TestPrecompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.dest = os.path.join(root, "docs")
+        self.manifest = os.path.join(root, ".cache", "gzip-manifest.json")
+
+        write_file(os.path.join(self.dest, "index.html"), PAGE)
+        write_file(os.path.join(self.dest, "blog", "post", "index.html"), PAGE)
+        write_file(os.path.join(self.dest, "index.css"), "body {}")
+        write_file(os.path.join(self.dest, "images", "tom.png"), PAGE)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def precompress(self) -> list:
+        with redirect_stdout(io.StringIO()):
+            return precompress_outputs(self.dest, manifest_path=self.manifest, min_size=100)
+
+    def test_first_run_compresses_text_outputs(self):
+        self.assertEqual(self.precompress(), [os.path.join("blog", "post", "index.html.gz"), "index.html.gz"])
+        # too small, and not a text type
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "tom.png.gz")))
+
+    def test_only_changed_files_are_recompressed(self):
+        self.precompress()
+        self.assertEqual(self.precompress(), [])
+
+        write_file(os.path.join(self.dest, "index.html"), PAGE + "<p>more</p>")
+        self.assertEqual(self.precompress(), ["index.html.gz"])
+
+        # a deleted .gz is put back
+        os.remove(os.path.join(self.dest, "index.html.gz"))
+        self.assertEqual(self.precompress(), ["index.html.gz"])
+
+    def test_removed_outputs_lose_their_gz(self):
+        self.precompress()
+        os.remove(os.path.join(self.dest, "blog", "post", "index.html"))
+        self.assertEqual(self.precompress(), [os.path.join("blog", "post", "index.html.gz")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+
+if __name__ == "__main__":
+    unittest.main()
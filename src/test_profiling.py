@@ -0,0 +1,128 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from generate_page import generate_pages_recursive
+from profiling import BuildProfiler, PageProfile
+from test_helpers import read_file, write_file
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestPageProfile(unittest.TestCase):
+    def test_laps_accumulate_per_phase(self):
+        profile = PageProfile("index.md")
+        profile.start()
+        profile.lap("read")
+        profile.lap("parse")
+        profile.lap("read")
+        self.assertEqual(list(profile.phases), ["read", "parse"])
+        self.assertGreaterEqual(profile.wall, 0)
+        self.assertAlmostEqual(profile.wall, sum(timings[0] for timings in profile.phases.values()))
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def make_page(self, path: str, wall: float) -> PageProfile:
+        profile = PageProfile(path)
+        profile.phases = {"parse": [wall, wall / 2], "write": [0.001, 0.0]}
+        return profile
+
+    def test_phase_totals_include_build_phases_and_pages(self):
+        profiler = BuildProfiler()
+        with profiler.phase("static"):
+            pass
+        profiler.add_page(self.make_page("a.md", 0.5))
+        profiler.add_page(self.make_page("b.md", 0.25))
+
+        totals = profiler.phase_totals()
+        self.assertIn("static", totals)
+        self.assertAlmostEqual(totals["parse"][0], 0.75)
+        self.assertAlmostEqual(totals["write"][0], 0.002)
+
+    def test_slowest_pages_and_report(self):
+        profiler = BuildProfiler()
+        for index, wall in enumerate((0.1, 0.3, 0.2)):
+            profiler.add_page(self.make_page(f"page{index}.md", wall))
+
+        self.assertEqual([page.path for page in profiler.slowest_pages(2)], ["page1.md", "page2.md"])
+        report = profiler.report(top=2)
+        self.assertIn("Slowest 2 of 3 page(s):", report)
+        self.assertIn("page1.md (mostly parse)", report)
+        self.assertNotIn("page0.md", report)
+
+    def test_write_json(self):
+        profiler = BuildProfiler()
+        profiler.add_page(self.make_page("a.md", 0.5))
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, ".cache", "profile.json")
+            profiler.write_json(path)
+            with open(path, 'r') as file:
+                data = json.load(file)
+
+        self.assertEqual(data["pages"][0]["path"], "a.md")
+        self.assertAlmostEqual(data["phases"]["parse"]["wall"], 0.5)
+
+
+class TestProfiledBuild(unittest.TestCase):
+    def test_profiled_build_matches_plain_build(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            write_file(template, TEMPLATE)
+            for index in range(3):
+                write_file(os.path.join(content, f"post{index}", "index.md"), f"# Post {index}\n\n[home](/index.html) **{index}**")
+
+            profiler = BuildProfiler()
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive("/site/", content, template, os.path.join(root, "plain"))
+                generate_pages_recursive("/site/", content, template, os.path.join(root, "profiled"), profiler=profiler)
+
+            self.assertEqual(len(profiler.pages), 3)
+            for phase in ("plan", "read", "blocks", "parse", "render", "template", "write"):
+                self.assertIn(phase, profiler.phase_totals())
+            for index in range(3):
+                rel_output = os.path.join(f"post{index}", "index.html")
+                self.assertEqual(
+                    read_file(os.path.join(root, "plain", rel_output)),
+                    read_file(os.path.join(root, "profiled", rel_output)),
+                )
+
+    def test_profiled_large_page_is_streamed(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            write_file(template, TEMPLATE)
+            write_file(os.path.join(content, "index.md"), "# Big\n\nA **large** page")
+
+            profiler = BuildProfiler()
+            with mock.patch("generate_page.STREAM_THRESHOLD", 0), mock.patch("generate_page.write_page_profiled") as write_page_profiled, \
+                    redirect_stdout(io.StringIO()):
+                generate_pages_recursive("/", content, template, os.path.join(root, "docs"), profiler=profiler)
+
+            write_page_profiled.assert_not_called()
+            self.assertEqual(list(profiler.pages[0].phases), ["stream"])
+            self.assertEqual(read_file(os.path.join(root, "docs", "index.html")),
+                             "<html><title>Big</title><body><div><h1>Big</h1><p>A <b>large</b> page</p></div></body></html>")
+
+    def test_parallel_build_reports_every_page(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            write_file(template, TEMPLATE)
+            for index in range(4):
+                write_file(os.path.join(content, f"post{index}", "index.md"), f"# Post {index}")
+
+            profiler = BuildProfiler()
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive("/", content, template, os.path.join(root, "docs"), jobs=2, profiler=profiler)
+
+            self.assertEqual(sorted(os.path.basename(os.path.dirname(page.path)) for page in profiler.pages),
+                             [f"post{index}" for index in range(4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from build_plan import plan_site
+from copy_static_content import sync_static_content
+from generate_page import generate_pages_recursive
+from sharding import SHARD_DOCS_DIR, SHARD_MANIFEST_NAME, merge_shards, parse_shard, select_shard, shard_of
+from test_helpers import read_tree, write_file
+
+TEMPLATE = '<html><head><link href="/index.css" rel="stylesheet"></head><title>{{ Title }}</title><body>{{ Content }}</body></html>'
+
+
+class TestShardSelection(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("0/1"), (0, 1))
+        self.assertEqual(parse_shard("3/4"), (3, 4))
+        for value in ("4/4", "-1/4", "1/0", "1", "a/b", "1/2/3"):
+            with self.assertRaises(ValueError, msg=value):
+                parse_shard(value)
+
+    def test_shard_of_is_stable(self):
+        # sha256 based, so the split doesn't change between runs, machines or path separators
+        self.assertEqual([shard_of(f"blog/post{index}/index.md", 4) for index in range(8)], [shard_of(f"blog/post{index}/index.md", 4) for index in range(8)])
+        self.assertEqual(shard_of(os.path.join("blog", "tom", "index.md"), 7), shard_of("blog/tom/index.md", 7))
+
+    def test_every_page_lands_in_exactly_one_shard(self):
+        with tempfile.TemporaryDirectory() as root:
+            for index in range(40):
+                write_file(os.path.join(root, "content", "blog", f"post{index}", "index.md"), f"# Post {index}")
+            plan = plan_site(os.path.join(root, "content"), os.path.join(root, "docs"))
+            shards = [select_shard(plan, (index, 3)) for index in range(3)]
+            self.assertEqual(sorted(page for shard in shards for page in shard), sorted(plan))
+            self.assertTrue(all(shards), "40 pages should give every one of 3 shards some work")
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.root = root
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.template = os.path.join(root, "template.html")
+        self.dest = os.path.join(root, "docs")
+        self.merge_manifest = os.path.join(root, ".cache", "merge-manifest.json")
+        self.workers = [os.path.join(root, ".shards", str(index)) for index in range(3)]
+
+        write_file(self.template, TEMPLATE)
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "tom.png"), "png bytes")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n![Tom](/images/tom.png)")
+        for index in range(12):
+            write_file(os.path.join(self.content, "blog", f"post{index}", "index.md"), f"# Post {index}\n\n[Home](/)")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def build_shard(self, index: int, count: int = 3, basepath: str = "/") -> list:
+        worker = self.workers[index]
+        docs = os.path.join(worker, SHARD_DOCS_DIR)
+        with redirect_stdout(io.StringIO()):
+            if index == 0:
+                sync_static_content(self.static, docs, manifest_path=os.path.join(worker, ".cache", "static-manifest.json"))
+            return generate_pages_recursive(basepath, self.content, self.template, docs, manifest_path=os.path.join(worker, ".cache", "build-manifest.json"),
+                                            static_dir=self.static, shard=(index, count), shard_manifest_path=os.path.join(worker, SHARD_MANIFEST_NAME))
+
+    def merge(self, workers: list = None) -> list:
+        with redirect_stdout(io.StringIO()):
+            return merge_shards(workers or self.workers, self.dest, manifest_path=self.merge_manifest)
+
+    def full_build(self) -> dict:
+        full = os.path.join(self.root, "full")
+        with redirect_stdout(io.StringIO()):
+            sync_static_content(self.static, full)
+            generate_pages_recursive("/", self.content, self.template, full)
+        return read_tree(full)
+
+    def test_merged_shards_match_a_full_build(self):
+        for index in range(3):
+            self.build_shard(index)
+        changed = self.merge()
+        self.assertEqual(read_tree(self.dest), self.full_build())
+        self.assertEqual(sorted(changed), sorted(read_tree(self.dest)))
+        # merging again has nothing to do
+        self.assertEqual(self.merge(), [])
+
+    def test_merge_leaves_identical_files_untouched(self):
+        for index in range(3):
+            self.build_shard(index)
+        self.merge()
+        merged_index = os.path.join(self.dest, "index.html")
+        mtime_ns = os.stat(merged_index).st_mtime_ns
+        # as if the shard had been rebuilt from scratch with the same output
+        shard_index = os.path.join(self.workers[shard_of("index.md", 3)], SHARD_DOCS_DIR, "index.html")
+        os.utime(shard_index, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        self.assertEqual(self.merge(), [])
+        self.assertEqual(os.stat(merged_index).st_mtime_ns, mtime_ns)
+
+    def test_missing_shard(self):
+        for index in range(3):
+            self.build_shard(index)
+        with self.assertRaises(ValueError) as cm:
+            self.merge(self.workers[:2])
+        self.assertIn("missing shard(s) 2/3", str(cm.exception))
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_shards_with_different_counts(self):
+        self.build_shard(0, 2)
+        self.build_shard(1)
+        self.build_shard(2)
+        with self.assertRaises(ValueError) as cm:
+            self.merge()
+        self.assertIn("disagree on the shard count", str(cm.exception))
+
+    def test_shards_with_different_basepaths(self):
+        self.build_shard(0)
+        self.build_shard(1, basepath="/ss-generator/")
+        self.build_shard(2)
+        with self.assertRaises(ValueError) as cm:
+            self.merge()
+        self.assertIn("different basepaths: ['/', '/ss-generator/']", str(cm.exception))
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_missing_output(self):
+        for index in range(3):
+            self.build_shard(index)
+        worker_docs = os.path.join(self.workers[1], SHARD_DOCS_DIR)
+        rel_output = sorted(read_tree(worker_docs))[0]
+        os.remove(os.path.join(worker_docs, rel_output))
+        with self.assertRaises(ValueError) as cm:
+            self.merge()
+        self.assertIn(f"missing its output {rel_output}", str(cm.exception))
+
+    def test_overlapping_files(self):
+        for index in range(3):
+            self.build_shard(index)
+        # a page output shard 1 doesn't own, or a static file, in a shard other than 0
+        write_file(os.path.join(self.workers[1], SHARD_DOCS_DIR, "index.css"), "body {}")
+        with self.assertRaises(ValueError) as cm:
+            self.merge()
+        self.assertIn("index.css, which isn't one of its pages", str(cm.exception))
+
+    def test_failed_shard_cannot_be_merged(self):
+        for index in range(3):
+            self.build_shard(index)
+        # a rebuild that dies halfway leaves no partial manifest behind, even though the outputs of the
+        # earlier build are all still there
+        write_file(os.path.join(self.content, "broken.md"), "no title")
+        index = shard_of("broken.md", 3)
+        with self.assertRaises(ValueError):
+            self.build_shard(index)
+        self.assertFalse(os.path.exists(os.path.join(self.workers[index], SHARD_MANIFEST_NAME)))
+        with self.assertRaises(ValueError) as cm:
+            self.merge()
+        self.assertIn("could not be read", str(cm.exception))
+
+    def test_deleted_page_is_removed_on_the_next_merge(self):
+        for index in range(3):
+            self.build_shard(index)
+        self.merge()
+        os.remove(os.path.join(self.content, "blog", "post3", "index.md"))
+        for index in range(3):
+            self.build_shard(index)
+        changed = self.merge()
+        self.assertIn(os.path.join("blog", "post3", "index.html"), changed)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post3", "index.html")))
+        self.assertEqual(read_tree(self.dest), self.full_build())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import LEAF_FACTORIES, TextNode, TextType, apply_basepath, resolve_url, text_node_to_html_node
 
 
 class TestTextNode(unittest.TestCase):
@@ -48,6 +48,12 @@ class TestTextNode(unittest.TestCase):
             "TextNode(This is a text node, text, https://www.boot.dev)", repr(node)
         )
 
+    def test_textnode_has_no_instance_dict(self):
+        node = TextNode("Node text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "not allowed"
+
 class TestTextNodeToHMLNode(unittest.TestCase):
 
     def test_raises_on_non_TextNode_obj(self):
@@ -169,5 +175,48 @@ class TestTextNodeToHMLNode(unittest.TestCase):
         )
 
 
+    def test_basepath_applied_to_site_relative_urls(self):
+        link = text_node_to_html_node(TextNode("Blog", TextType.LINK, "/blog/post"), "/site/")
+        image = text_node_to_html_node(TextNode("Logo", TextType.IMAGE, "/images/logo.png"), "/site/")
+        self.assertEqual(link.props["href"], "/site/blog/post")
+        self.assertEqual(image.props["src"], "/site/images/logo.png")
+
+    def test_basepath_leaves_other_urls_alone(self):
+        for url in ("https://google.com", "//cdn.example.com/a.png", "./media/rando.png", "#top"):
+            self.assertEqual(apply_basepath(url, "/site/"), url)
+        self.assertEqual(apply_basepath("/blog", "/"), "/blog")
+
+    def test_fingerprinted_assets(self):
+        assets = {"images/logo.png": "images/logo.0123456789ab.png"}
+        self.assertEqual(resolve_url("/images/logo.png?v=1#top", "/site/", assets), "/site/images/logo.0123456789ab.png?v=1#top")
+        self.assertEqual(resolve_url("/images/other.png", "/site/", assets), "/site/images/other.png")
+        image = text_node_to_html_node(TextNode("Logo", TextType.IMAGE, "/images/logo.png"), "/", assets)
+        self.assertEqual(image.props["src"], "/images/logo.0123456789ab.png")
+
+    def test_every_text_type_has_a_factory(self):
+        self.assertEqual(set(LEAF_FACTORIES), set(TextType))
+
+    def test_link_and_image_attributes_are_escaped(self):
+        link = text_node_to_html_node(TextNode("Q&A", TextType.LINK, "/search?q=a&b"))
+        self.assertEqual(link.to_html(), '<a href="/search?q=a&amp;b">Q&amp;A</a>')
+        image = text_node_to_html_node(TextNode('say "hi"', TextType.IMAGE, "/hi.png"))
+        self.assertEqual(image.to_html(), '<img src="/hi.png" alt="say &quot;hi&quot;"></img>')
+
+    def test_link_props_changed_after_creation(self):
+        link = text_node_to_html_node(TextNode("Docs", TextType.LINK, "/docs"))
+        link.props["href"] = "/x"
+        self.assertEqual(link.to_html(), '<a href="/x">Docs</a>')
+
+    def test_interned_leaves_are_shared(self):
+        node = TextNode("Blog", TextType.LINK, "/blog")
+        first = text_node_to_html_node(node, "/site/", interned=True)
+        self.assertIs(text_node_to_html_node(TextNode("Blog", TextType.LINK, "/blog"), "/site/", interned=True), first)
+        self.assertIsNot(text_node_to_html_node(node, "/site/"), first)
+        # the resolved url is part of the key
+        self.assertEqual(text_node_to_html_node(node, "/", interned=True).props["href"], "/blog")
+        self.assertEqual(first.props["href"], "/site/blog")
+
+
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,9 +1,9 @@
 import unittest
 
 from textnode_helpers import split_nodes_delimiter, is_textnode, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type
-from textnode_helpers import BlockType
+from textnode_helpers import BlockType, block_is_ordered_list, block_is_quote, block_is_unordered_list, classify_block
 from textnode_helpers import markdown_to_html_node
-from textnode_helpers import extract_title
+from textnode_helpers import extract_title, extract_title_from_lines, iter_markdown_blocks, render_blocks
 from textnode import TextNode, TextType, text_node_to_html_node
 from htmlnode import LeafNode
 
@@ -345,6 +345,27 @@ class TestSplitLinks(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_links_repeated_link(self):
+        node = TextNode("[a](/x) and [a](/x) and [a](/x).", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertListEqual(
+            [
+                TextNode("a", TextType.LINK, "/x"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "/x"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "/x"),
+                TextNode(".", TextType.TEXT),
+            ],
+            new_nodes,
+        )
+
+    def test_split_links_many_links(self):
+        node = TextNode(" ".join(f"[link {index}](/page/{index})" for index in range(5000)), TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(len(new_nodes), 5000)
+        self.assertEqual(new_nodes[-1], TextNode("link 4999", TextType.LINK, "/page/4999"))
+
 class TestTextToTextNodes(unittest.TestCase):
 
     def test_texttotextnodes_standard(self):
@@ -410,6 +431,67 @@ class TestTextToTextNodes(unittest.TestCase):
             new_nodes,
         )
 
+    def test_texttotextnodes_matches_multi_pass_pipeline(self):
+        samples = [
+            "plain text only",
+            "**bold** then _italic_ then `code`",
+            "**one** **two**",
+            "a [link](https://boot.dev) [side](https://x.org) by side ![img](/a.png) end",
+            "![image](/images/tolkien.png)",
+            "Here's the deal, **I like Tolkien**.",
+            "- trailing [link](/blog/tom)",
+            "**See [docs](/x)**",
+            "_an ![icon](/i.png) inline_ and **[a](/a) [b](/b)**",
+        ]
+        for text in samples:
+            nodes = split_nodes_delimiter([TextNode(text, TextType.TEXT)], "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            nodes = split_nodes_link(split_nodes_image(nodes))
+            self.assertListEqual(nodes, text_to_textnodes(text), text)
+
+    def test_texttotextnodes_code_content_is_literal(self):
+        self.assertListEqual(
+            [
+                TextNode("x ** y", TextType.CODE),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("[not](a link)", TextType.CODE),
+            ],
+            text_to_textnodes("`x ** y` and `[not](a link)`"),
+        )
+
+    def test_texttotextnodes_link_inside_bold(self):
+        self.assertListEqual(
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("docs", TextType.LINK, "/x"),
+            ],
+            text_to_textnodes("**See [docs](/x)**"),
+        )
+
+    def test_texttotextnodes_underscore_inside_link(self):
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("snake_case", TextType.LINK, "https://example.com/a_b"),
+            ],
+            text_to_textnodes("see [snake_case](https://example.com/a_b)"),
+        )
+
+    def test_texttotextnodes_image_with_empty_alt(self):
+        self.assertListEqual(
+            [TextNode("", TextType.IMAGE, "/a.png")],
+            text_to_textnodes("![](/a.png)"),
+        )
+
+    def test_texttotextnodes_unclosed_delimiter(self):
+        with self.assertRaises(SyntaxError) as cm:
+            text_to_textnodes("This is **unclosed")
+        self.assertEqual(
+            cm.exception.args[0],
+            "Node text is missing a closing delimiter '**'. Check your input string."
+        )
+
 class TestMarkdownToBlocks(unittest.TestCase):
 
     def test_markdown_to_blocks(self):
@@ -473,6 +555,39 @@ This is the same paragraph on a new line
                 "- This is a list\n- with items",
             ],
         )
+
+
+class TestIterMarkdownBlocks(unittest.TestCase):
+
+    def test_matches_markdown_to_blocks(self):
+        documents = [
+            "# Title\n\nA paragraph\non two lines\n\n- a\n- b\n",
+            "\n\n\n\nafter blank lines\n\n\n",
+            "one\n \ntwo\n\n \n\nthree",
+            "a\n\n\nb\n\n\n\nc",
+            "",
+            "\n",
+            "no trailing newline",
+        ]
+        for markdown in documents:
+            self.assertEqual(
+                list(iter_markdown_blocks(markdown.splitlines(keepends=True))),
+                markdown_to_blocks(markdown),
+            )
+
+    def test_is_lazy(self):
+        lines = iter(["first\n", "\n", "second\n"])
+        blocks = iter_markdown_blocks(lines)
+        self.assertEqual(next(blocks), "first")
+        # only the first block's lines and its separator have been read
+        self.assertEqual(next(lines), "second\n")
+
+    def test_render_blocks_matches_html_node(self):
+        md = "# Title\n\nSome **bold** text\n\n- one\n- two\n\n```\ncode\n```"
+        chunks = []
+        render_blocks(iter_markdown_blocks(md.splitlines(keepends=True)), chunks.append)
+        self.assertEqual("".join(chunks), markdown_to_html_node(md).to_html())
+
         
 class TestBlockToBlockType(unittest.TestCase):
 
@@ -615,6 +730,33 @@ It should be recognized as a paragraph block.
             BlockType.PARAGRAPH
         )
 
+class TestClassifyBlock(unittest.TestCase):
+
+    def test_matches_line_predicates(self):
+        blocks = [
+            "> quote\n> more", ">", "> quote\nnot", "- a\n- b", "- a\n-b", "-",
+            "1. a\n2. b\n3. c", "1. a\n3. b", "2. a", "1. a\n- b", "- a\n> b",
+            "plain text", "> - 1. mixed", "  - padded\n- list  ",
+        ]
+        for block in blocks:
+            stripped = block.strip()
+            if block_is_quote(stripped):
+                expected = BlockType.QUOTE
+            elif block_is_unordered_list(stripped):
+                expected = BlockType.UNORDERED_LIST
+            elif block_is_ordered_list(stripped):
+                expected = BlockType.ORDERED_LIST
+            else:
+                expected = BlockType.PARAGRAPH
+            block_type, lines = classify_block(block)
+            self.assertEqual(block_type, expected, block)
+            self.assertEqual(lines, stripped.split("\n"))
+
+    def test_heading_and_code_skip_the_split(self):
+        self.assertEqual(classify_block("## Heading"), (BlockType.HEADING, None))
+        self.assertEqual(classify_block("```\ncode\n```"), (BlockType.CODE, None))
+
+
 class TestMarkdownToHTMLNode(unittest.TestCase):
 
     def test_paragraphs(self):
@@ -705,6 +847,11 @@ the **same** even with inline stuff
             "<div><ul><li>Item with some <i>italic</i> text</li><li>Item with some <b>bold</b> text</li><li>Item with some <code>code</code> text</li></ul></div>",
         )
 
+    def test_leaves_are_not_shared_between_documents(self):
+        first = markdown_to_html_node("[home](/)")
+        first.children[0].children[0].props["href"] = "/changed"
+        self.assertEqual(markdown_to_html_node("[home](/)").to_html(), '<div><p><a href="/">home</a></p></div>')
+
 class TestExtractTitle(unittest.TestCase):
 
     def test_extract_title(self):
@@ -733,5 +880,11 @@ Here's the deal, **I like Tolkien**.
             "No H1 header [#] found in provided markdown"
         )
 
+    def test_extract_title_from_lines(self):
+        lines = iter(["Intro\n", "# Title \n", "# Later\n"])
+        self.assertEqual(extract_title_from_lines(lines), "Title")
+        # stops reading once the title is found
+        self.assertEqual(next(lines), "# Later\n")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
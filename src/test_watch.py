@@ -0,0 +1,120 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from generate_page import generate_pages_recursive
+from watch import SiteWatcher, diff_snapshots, snapshot
+from test_helpers import read_file, write_file
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_diff_snapshots(self):
+        old = {"a.md": (1, 10), "b.md": (1, 10), "c.md": (1, 10)}
+        new = {"a.md": (1, 10), "b.md": (2, 12), "d.md": (1, 10)}
+        self.assertEqual(diff_snapshots(old, new), (["b.md", "d.md"], ["c.md"]))
+
+    def test_snapshot_missing_dir(self):
+        self.assertEqual(snapshot("/nonexistent/dir"), {})
+
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.dest = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.manifest = os.path.join(root, ".cache", "build-manifest.json")
+
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "post", "index.md"), "# Post")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive("/", self.content, self.template, self.dest, manifest_path=self.manifest, static_dir=self.static)
+        self.watcher = SiteWatcher("/", self.content, self.static, self.template, self.dest, manifest_path=self.manifest,
+                                   static_manifest_path=os.path.join(root, ".cache", "static-manifest.json"))
+
+    def tearDown(self):
+        self.watcher.close()
+        self.temp_dir.cleanup()
+
+    def poll(self) -> tuple:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            changed = self.watcher.poll()
+        return changed, output.getvalue()
+
+    def test_no_changes(self):
+        self.assertEqual(self.poll(), (False, ""))
+
+    def test_page_edit_rebuilds_only_that_page(self):
+        write_file(os.path.join(self.content, "post", "index.md"), "# Edited post")
+        changed, log = self.poll()
+        self.assertTrue(changed)
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertIn("Rebuilt 1 page(s) and 0 asset(s)", log)
+        self.assertEqual(read_file(os.path.join(self.dest, "post", "index.html")), "<title>Edited post</title><div><h1>Edited post</h1></div>")
+
+        # the manifest is kept up to date, so a regular build has nothing left to do
+        output = io.StringIO()
+        with redirect_stdout(output):
+            generate_pages_recursive("/", self.content, self.template, self.dest, manifest_path=self.manifest)
+        self.assertNotIn("Generating page", output.getvalue())
+
+    def test_page_removal(self):
+        os.remove(os.path.join(self.content, "post", "index.md"))
+        self.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "post", "index.html")))
+
+    def test_static_change(self):
+        write_file(os.path.join(self.static, "index.css"), "body { margin: 0; }")
+        changed, log = self.poll()
+        self.assertIn("Rebuilt 0 page(s) and 1 asset(s)", log)
+        self.assertEqual(read_file(os.path.join(self.dest, "index.css")), "body { margin: 0; }")
+
+    def test_static_change_in_link_mode(self):
+        self.watcher.link = True
+        write_file(os.path.join(self.static, "index.css"), "body { margin: 0; }")
+        self.poll()
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"), os.path.join(self.dest, "index.css")))
+
+    def test_gzip_siblings_follow_a_rebuild(self):
+        self.watcher.gzip_manifest_path = os.path.join(self.temp_dir.name, ".cache", "gzip-manifest.json")
+        self.watcher.gzip_min_size = 0
+        write_file(os.path.join(self.content, "post", "index.md"), "# Edited post\n\n" + "text " * 100)
+        self.poll()
+        with gzip.open(os.path.join(self.dest, "post", "index.html.gz"), 'rt') as file:
+            self.assertEqual(file.read(), read_file(os.path.join(self.dest, "post", "index.html")))
+
+    def test_asset_change_rebuilds_pages_that_reference_it(self):
+        write_file(os.path.join(self.static, "images", "tom.png"), "v1")
+        write_file(os.path.join(self.content, "post", "index.md"), "# Post\n\n![Tom](/images/tom.png)")
+        self.poll()
+
+        write_file(os.path.join(self.static, "images", "tom.png"), "v2")
+        changed, log = self.poll()
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertIn("post", log)
+        self.assertIn("Rebuilt 1 page(s) and 1 asset(s)", log)
+
+    def test_template_change_rebuilds_everything(self):
+        write_file(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        changed, log = self.poll()
+        self.assertEqual(log.count("Generating page"), 2)
+        self.assertTrue(read_file(os.path.join(self.dest, "index.html")).startswith("<h1>Home</h1>"))
+
+    def test_failed_rebuild_keeps_watching(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nunclosed **bold")
+        changed, log = self.poll()
+        self.assertTrue(changed)
+        self.assertIn("Rebuild failed", log)
+
+
+if __name__ == "__main__":
+    unittest.main()
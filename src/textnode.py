@@ -1,4 +1,5 @@
 from enum import Enum
+from functools import lru_cache
 from htmlnode import LeafNode
 
 class TextType(Enum):
@@ -10,6 +11,9 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    # one of these is allocated per inline span, so skip the per-instance __dict__
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type: TextType, url = None):
         self.text = text
         self.text_type = text_type
@@ -28,30 +32,80 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
     
-def text_node_to_html_node(text_node: TextNode):
+def apply_basepath(url: str, basepath: str = "/") -> str:
+    # site-relative urls get the basepath, external and protocol-relative ones are left alone
+    if basepath == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return basepath + url[1:]
+
+def resolve_url(url: str, basepath: str = "/", assets: dict = None) -> str:
+    """
+        Final url for a link or image: site-relative urls to a fingerprinted static file are pointed at its
+        hashed name through assets (original path -> fingerprinted path, both relative to the site root),
+        keeping any query or fragment, and then get the basepath.
+    """
+    if assets and url.startswith("/") and not url.startswith("//"):
+        path, separator, suffix = url.partition("#")
+        path, query_separator, query = path.partition("?")
+        fingerprinted = assets.get(path[1:])
+        if fingerprinted is not None:
+            url = "/" + fingerprinted + (query_separator + query) + (separator + suffix)
+    return apply_basepath(url, basepath)
+
+# each TextType maps to a factory building its leaf from the text and the already resolved url
+def text_leaf(text: str, url: str) -> LeafNode:
+    return LeafNode(None, text, None)
+
+def bold_leaf(text: str, url: str) -> LeafNode:
+    return LeafNode("b", text, None)
+
+def italic_leaf(text: str, url: str) -> LeafNode:
+    return LeafNode("i", text, None)
+
+def code_leaf(text: str, url: str) -> LeafNode:
+    return LeafNode("code", text, None)
+
+def link_leaf(text: str, url: str) -> LeafNode:
+    return LeafNode("a", text, {"href": url})
 
+def image_leaf(text: str, url: str) -> LeafNode:
+    return LeafNode("img", "", {"src": url, "alt": text})
+
+LEAF_FACTORIES = {
+    TextType.TEXT: text_leaf,
+    TextType.BOLD: bold_leaf,
+    TextType.ITALIC: italic_leaf,
+    TextType.CODE: code_leaf,
+    TextType.LINK: link_leaf,
+    TextType.IMAGE: image_leaf,
+}
+
+# text types whose url goes through resolve_url
+URL_TEXT_TYPES = {TextType.LINK, TextType.IMAGE}
+
+@lru_cache(maxsize=4096)
+def interned_leaf(factory, text: str, url: str) -> LeafNode:
+    # index pages repeat the same links over and over, so callers that never modify the leaves they
+    # get can share equal ones
+    return factory(text, url)
+
+def text_node_to_html_node(text_node: TextNode, basepath: str = "/", assets: dict = None, interned: bool = False):
+    """
+        Converts a TextNode into a LeafNode, with link and image urls resolved through basepath and
+        assets (see resolve_url). With interned, equal nodes come back as one shared LeafNode, which
+        callers must then treat as read-only; the leaves are shared across the whole process, so this
+        is opt-in and the markdown pipeline doesn't use it.
+    """
     if not isinstance(text_node, TextNode):
             raise TypeError(f"Input parameter must be of type TextNode. Received {type(text_node)}")
-    
-    match text_node.text_type:
-        case TextType.TEXT:
-            return LeafNode(None, text_node.text, None)
-        case TextType.BOLD:
-            return LeafNode("b", text_node.text, None)
-        case TextType.ITALIC:
-            return LeafNode("i", text_node.text, None)
-        case TextType.CODE:
-            return LeafNode("code", text_node.text, None)
-        case TextType.LINK:
-            properties = {
-                "href": text_node.url
-            }
-            return LeafNode("a", text_node.text, properties)
-        case TextType.IMAGE:
-            properties = {
-                "src": text_node.url,
-                "alt": text_node.text
-            }
-            return LeafNode("img", "", properties)
-        case _:
-            raise ValueError(f"Input text_type [{text_node.text_type}] not supported.")
\ No newline at end of file
+
+    factory = LEAF_FACTORIES.get(text_node.text_type)
+    if factory is None:
+        raise ValueError(f"Input text_type [{text_node.text_type}] not supported.")
+
+    url = text_node.url
+    if text_node.text_type in URL_TEXT_TYPES:
+        url = resolve_url(url, basepath, assets)
+    if interned:
+        return interned_leaf(factory, text_node.text, url)
+    return factory(text_node.text, url)
@@ -1,7 +1,7 @@
 import re
 from enum import Enum
 from textnode import TextNode, TextType, text_node_to_html_node
-from htmlnode import HTMLNode, ParentNode, LeafNode
+from htmlnode import HTMLNode, ParentNode, LeafNode, RawNode
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -44,97 +44,131 @@ def split_nodes_delimiter(old_nodes: list, delimiter: str, text_type: TextType)
     
     return nodes_list
             
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def extract_markdown_images(text: str) -> tuple:
     if len(text) == 0:
         raise Exception("Input text string cannot be null or emtpy")
 
-    image_data = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)    
+    image_data = IMAGE_PATTERN.findall(text)
     return image_data
 
 def extract_markdown_links(text: str):
    if len(text) == 0:
         raise Exception("Input text string cannot be null or emtpy")
 
-   link_data = re.findall(r"\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+   link_data = LINK_PATTERN.findall(text)
    return link_data
 
-def split_nodes_image(old_nodes: list) -> list:
+def split_nodes_pattern(old_nodes: list, pattern: re.Pattern, text_type: TextType) -> list:
+    """
+        Splits each node's text around the matches of an image or link pattern. Works from the match
+        offsets, so each node's text is scanned once no matter how many matches it holds.
+    """
     nodes_list = []
 
     for node in old_nodes:
-        images = extract_markdown_images(node.text)
-
-        # if there are no images, append the full text string and return
-        if len(images) == 0:
+        text = node.text
+        # keep track of where the unconsumed text starts
+        cursor = 0
+        for match in pattern.finditer(text):
+            # make sure left side of the match is not None or empty
+            if text[cursor:match.start()].strip():
+                nodes_list.append(TextNode(text[cursor:match.start()], TextType.TEXT))
+
+            # then, append the image or link data
+            nodes_list.append(TextNode(match.group(1), text_type, match.group(2)))
+            cursor = match.end()
+
+        # if there are no matches, append the original node
+        if cursor == 0:
             nodes_list.append(node)
             continue
-        
-        # set temp variable to keep track of remaining text
-        remaining_text = node.text
-        for image in images:
-            image_alt = image[0]
-            image_link = image[1]
-            sections = remaining_text.split(f"![{image_alt}]({image_link})", 1)
-            # make sure left side of split is not None or empty
-            if sections[0].strip():
-                nodes_list.append(TextNode(sections[0], TextType.TEXT))
-
-            # then, append the image data
-            nodes_list.append(TextNode(image_alt, TextType.IMAGE, image_link))
-            remaining_text = sections[1]
 
         # if there is any text left over, append that
-        if remaining_text and not remaining_text.isspace():
-            nodes_list.append(TextNode(remaining_text, TextType.TEXT))
+        if text[cursor:].strip():
+            nodes_list.append(TextNode(text[cursor:], TextType.TEXT))
     return nodes_list
 
+def split_nodes_image(old_nodes: list) -> list:
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
 def split_nodes_link(old_nodes: list) -> list:
-    nodes_list = []
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+# a single pattern for everything that can open an inline element. images are tried before links,
+# so "![" is never mistaken for a link with a stray "!" in front of it
+INLINE_TOKEN_PATTERN = re.compile(r"(\*\*|`|_)|" + IMAGE_PATTERN.pattern + "|" + LINK_PATTERN.pattern)
+INLINE_DELIMITERS = {
+    "**": TextType.BOLD,
+    "`": TextType.CODE,
+    "_": TextType.ITALIC,
+}
+
+def append_text_run(nodes_list: list, text: str, start: int, end: int, tokens: list) -> None:
+    # a run is the plain text between two delimited spans, with any images and links found inside it
+    if len(tokens) == 0:
+        if end > start:
+            nodes_list.append(TextNode(text[start:end], TextType.TEXT))
+        return
+
+    # around images and links, whitespace-only text is dropped
+    cursor = start
+    for token_start, token_end, token_node in tokens:
+        if text[cursor:token_start].strip():
+            nodes_list.append(TextNode(text[cursor:token_start], TextType.TEXT))
+        nodes_list.append(token_node)
+        cursor = token_end
+
+    if text[cursor:end].strip():
+        nodes_list.append(TextNode(text[cursor:end], TextType.TEXT))
 
-    for node in old_nodes:
-        links = extract_markdown_links(node.text)
-
-        # if there are no links, append the full text string and return
-        if len(links) == 0:
-            nodes_list.append(node)
+def text_to_textnodes(text: str) -> list:
+    """
+        Splits text into TextNodes in a single left-to-right scan. Whichever inline element opens first wins:
+        bold, code and italic spans run to their closing delimiter, and images and links are picked out of
+        the plain text in between. Code spans are taken literally; inside bold and italic spans images and
+        links are still split out, as the multi-pass pipeline did.
+    """
+    nodes_list = []
+    run_start = 0
+    run_tokens = []
+
+    position = 0
+    while True:
+        match = INLINE_TOKEN_PATTERN.search(text, position)
+        if match is None:
+            break
+
+        delimiter = match.group(1)
+        if delimiter is None:
+            # images and links stay part of the current run of plain text
+            if match.group(3) is not None:
+                token_node = TextNode(match.group(2), TextType.IMAGE, match.group(3))
+            else:
+                token_node = TextNode(match.group(4), TextType.LINK, match.group(5))
+            run_tokens.append((match.start(), match.end(), token_node))
+            position = match.end()
             continue
-        
-        # set temp variable to keep track of remaining text
-        remaining_text = node.text
-        for link in links:
-            link_text = link[0]
-            link_url = link[1]
-            sections = remaining_text.split(f"[{link_text}]({link_url})", 1)
-            # make sure left side of split is not None or empty
-            if sections[0].strip():
-                nodes_list.append(TextNode(sections[0], TextType.TEXT))
-
-            # then, append the link data
-            nodes_list.append(TextNode(link_text, TextType.LINK, link_url))
-            remaining_text = sections[1]
 
-        # if there is any text left over, append that
-        if remaining_text and not remaining_text.isspace():
-            nodes_list.append(TextNode(remaining_text, TextType.TEXT))
-    return nodes_list
+        # delimited span: the content runs up to the matching closing delimiter
+        closing_index = text.find(delimiter, match.end())
+        if closing_index == -1:
+            raise SyntaxError(f"Node text is missing a closing delimiter '{delimiter}'. Check your input string.")
 
-def text_to_textnodes(text: str) -> list:
-    nodes_list = []
-    # convert text to textnode
-    starting_text = TextNode(text, TextType.TEXT)
-
-    # get bold
-    nodes_list = split_nodes_delimiter([starting_text], "**", TextType.BOLD)
-    # get code
-    nodes_list = split_nodes_delimiter(nodes_list, "`", TextType.CODE)
-    # get italic
-    nodes_list = split_nodes_delimiter(nodes_list, "_", TextType.ITALIC)
-    # split any images
-    nodes_list = split_nodes_image(nodes_list)
-    # get links
-    nodes_list = split_nodes_link(nodes_list)
+        append_text_run(nodes_list, text, run_start, match.start(), run_tokens)
+        if closing_index > match.end():
+            span_node = TextNode(text[match.end():closing_index], INLINE_DELIMITERS[delimiter])
+            if span_node.text_type == TextType.CODE or "[" not in span_node.text:
+                nodes_list.append(span_node)
+            else:
+                nodes_list.extend(split_nodes_link(split_nodes_image([span_node])))
+
+        position = run_start = closing_index + len(delimiter)
+        run_tokens = []
 
+    append_text_run(nodes_list, text, run_start, len(text), run_tokens)
     return nodes_list
 
 def markdown_to_blocks(markdown: str) -> list:
@@ -150,6 +184,27 @@ def markdown_to_blocks(markdown: str) -> list:
 
     return final_block_list
 
+def iter_markdown_blocks(lines):
+    """
+        Lazily yields the same blocks as markdown_to_blocks from an iterable of lines that keep their
+        line endings, such as an open file. Only the block being built is held in memory.
+    """
+    block_lines = []
+    for line in lines:
+        # a "\n\n" separator is a line ending followed by an empty line; the separator's first
+        # newline is the last character of the block so far
+        if line == "\n" and block_lines and block_lines[-1].endswith("\n"):
+            block = "".join(block_lines)[:-1]
+            block_lines = []
+            if block and not block.isspace():
+                yield block.strip()
+        else:
+            block_lines.append(line)
+
+    block = "".join(block_lines)
+    if block and not block.isspace():
+        yield block.strip()
+
 
 def block_is_ordered_list(markdown: str) -> bool:
     # split the block
@@ -190,37 +245,52 @@ def block_is_quote(markdown: str) -> bool:
 
     return True
 
-def block_to_block_type(markdown: str) -> BlockType:
+# the 1-6 valid header combinations (including whitespace after "#")
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
 
-    # switch through the markdown block to determine the blocktype:
+def classify_block(markdown: str) -> tuple:
+    """
+        Decides the BlockType of a block in a single scan over its lines and returns it together with
+        those lines (None for headings and code, which don't need them), so new_html_node doesn't have
+        to split the block again. Gives the same result as block_is_quote, block_is_unordered_list and
+        block_is_ordered_list checked in turn.
+    """
     # trim to remove leading and trailing whitespace
     markdown = markdown.strip()
-    match markdown:
-        # check the tuple for the 1-6 valid header combinations (including whitespace after "#")
-        case markdown if markdown.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-            return BlockType.HEADING
-        case markdown if markdown.startswith("```") and markdown.endswith("```"):
-            return BlockType.CODE
-        case markdown if block_is_quote(markdown):
-            return BlockType.QUOTE
-        case markdown if block_is_unordered_list(markdown):
-            return BlockType.UNORDERED_LIST
-        case markdown if block_is_ordered_list(markdown):
-            return BlockType.ORDERED_LIST
-        case _:
-            return BlockType.PARAGRAPH
+    if markdown.startswith(HEADING_PREFIXES):
+        return BlockType.HEADING, None
+    if markdown.startswith("```") and markdown.endswith("```"):
+        return BlockType.CODE, None
+
+    lines = markdown.split("\n")
+    # the quote, unordered and ordered list prefixes are mutually exclusive, so the first line picks
+    # the only candidate and the scan just confirms it for the remaining lines
+    first_line = lines[0]
+    if first_line.startswith(">"):
+        if all(line.startswith(">") for line in lines):
+            return BlockType.QUOTE, lines
+    elif first_line.startswith("- "):
+        if all(line.startswith("- ") for line in lines):
+            return BlockType.UNORDERED_LIST, lines
+    elif first_line.startswith("1. "):
+        if all(line.startswith(f"{line_number}. ") for line_number, line in enumerate(lines, 1)):
+            return BlockType.ORDERED_LIST, lines
+    return BlockType.PARAGRAPH, lines
+
+def block_to_block_type(markdown: str) -> BlockType:
+    return classify_block(markdown)[0]
         
 def convert_newline_to_space(text: str) -> str:
     return text.replace("\n", " ")
         
-def text_to_children(text: str) -> list:
+def text_to_children(text: str, basepath: str = "/", assets: dict = None) -> list:
     child_nodes = []
     text_nodes = text_to_textnodes(convert_newline_to_space(text))
 
 
     # for each node, convert to leafnode
     for node in text_nodes:
-        child_nodes.append(text_node_to_html_node(node))
+        child_nodes.append(text_node_to_html_node(node, basepath, assets))
     
     return child_nodes
 
@@ -233,50 +303,54 @@ def get_html_heading_type(heading: str) -> str:
 def clean_unordered_list_item(item: str) -> str:
     return item.lstrip("- ").strip()
 
-def get_unordered_list_items(list_items: list) -> list:
+def get_unordered_list_items(list_items: list, basepath: str = "/", assets: dict = None) -> list:
 
     # each item is a leafNode, process and return a <li> element using a list comprehension
     return [
-        ParentNode("li", text_to_children(clean_unordered_list_item(item)))
+        ParentNode("li", text_to_children(clean_unordered_list_item(item), basepath, assets))
         for item in list_items
     ]
 
 def clean_ordered_list_item(item: str) -> str:
     return re.sub(r"^\d+\.\s+", "", item.lstrip())
 
-def get_ordered_list_items(list_items: list) -> list:
+def get_ordered_list_items(list_items: list, basepath: str = "/", assets: dict = None) -> list:
     return [
-        ParentNode("li", text_to_children(clean_ordered_list_item(item)))
+        ParentNode("li", text_to_children(clean_ordered_list_item(item), basepath, assets))
         for item in list_items
     ]
 
-def new_html_node(block: str, block_type: BlockType) -> HTMLNode:
+def new_html_node(block: str, block_type: BlockType, basepath: str = "/", assets: dict = None, lines: list = None) -> HTMLNode:
+    # basepath and the fingerprinted asset names are applied to link and image urls as their nodes are
+    # built (see textnode.resolve_url). lines is the block already split on newlines, as returned by classify_block
+    if lines is None and block_type in (BlockType.QUOTE, BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+        lines = block.split("\n")
 
     match block_type:
         case BlockType.PARAGRAPH:
-            child_nodes = text_to_children(block)
+            child_nodes = text_to_children(block, basepath, assets)
             html_node = ParentNode("p", child_nodes)
         
         case BlockType.HEADING:
             text_content = block.lstrip("#").strip()
-            child_nodes = text_to_children(text_content)
+            child_nodes = text_to_children(text_content, basepath, assets)
             # determine the heading level
             heading_level = get_html_heading_type(block)
             html_node = ParentNode(heading_level, child_nodes)
 
         case BlockType.QUOTE:
-            block_lines = [line.lstrip("> ").strip() for line in block.split("\n")]
+            block_lines = [line.lstrip("> ").strip() for line in lines]
             clean_block = " ".join(block_lines)
-            child_nodes = text_to_children(clean_block)
+            child_nodes = text_to_children(clean_block, basepath, assets)
             html_node = ParentNode("blockquote", child_nodes)
 
         case BlockType.UNORDERED_LIST:
             # need to split by newlines, then iteratively call text_to_children
-            child_nodes = get_unordered_list_items(block.split("\n"))
+            child_nodes = get_unordered_list_items(lines, basepath, assets)
             html_node = ParentNode("ul", child_nodes)
         
         case BlockType.ORDERED_LIST:
-            child_nodes = get_ordered_list_items(block.split("\n"))
+            child_nodes = get_ordered_list_items(lines, basepath, assets)
             html_node = ParentNode("ol", child_nodes)
 
         case BlockType.CODE:
@@ -286,32 +360,69 @@ def new_html_node(block: str, block_type: BlockType) -> HTMLNode:
 
     return html_node
         
-def markdown_to_html_node(markdown) -> HTMLNode:
+def cached_html_node(block: str, block_type: BlockType, block_cache, basepath: str = "/", assets: dict = None, lines: list = None) -> HTMLNode:
+    # reuse the rendered html when this exact block has been seen before. the basepath and asset names
+    # end up in the html, so they have to be part of the cache's context
+    block_html = block_cache.get(block, block_type)
+    if block_html is None:
+        block_html = new_html_node(block, block_type, basepath, assets, lines).to_html()
+        block_cache.put(block, block_type, block_html)
+    return RawNode(block_html)
+
+def markdown_to_html_node(markdown, block_cache=None, basepath: str = "/", assets: dict = None) -> HTMLNode:
     """
         converts a full markdown document into a single parent HTMLNode. That one parent HTMLNode should
         contain many child HTMLNode objects representing the nested elements.
+        With a block_cache (see block_cache.BlockCache), blocks rendered before come back as RawNodes.
+        Site-relative link and image urls are prefixed with basepath, and mapped through assets (original
+        static path -> fingerprinted path) when asset fingerprinting is on.
     """
 
     # split full markdown into blocks:
     md_blocks = markdown_to_blocks(markdown)
 
+    return blocks_to_html_node(md_blocks, block_cache, basepath, assets)
+
+def blocks_to_html_node(md_blocks: list, block_cache=None, basepath: str = "/", assets: dict = None) -> HTMLNode:
+    """
+        The second half of markdown_to_html_node, for callers that already split the markdown into blocks.
+    """
     block_nodes = []
 
     for block in md_blocks: 
-        block_type = block_to_block_type(block)
-        html_node = new_html_node(block, block_type)
-        block_nodes.append(html_node)
+        block_nodes.append(block_to_html_node(block, block_cache, basepath, assets))
 
     return ParentNode("div", block_nodes)
 
+def block_to_html_node(block: str, block_cache=None, basepath: str = "/", assets: dict = None) -> HTMLNode:
+    # block comes stripped from markdown_to_blocks, so the lines classify_block split off can be reused
+    block_type, lines = classify_block(block)
+    if block_cache is not None:
+        return cached_html_node(block, block_type, block_cache, basepath, assets, lines)
+    return new_html_node(block, block_type, basepath, assets, lines)
+
+def render_blocks(md_blocks, write, block_cache=None, basepath: str = "/", assets: dict = None) -> None:
+    """
+        Streams the same html as blocks_to_html_node(md_blocks).render(write), one block at a time, so
+        md_blocks can be a generator such as iter_markdown_blocks.
+    """
+    write("<div>")
+    for block in md_blocks:
+        block_to_html_node(block, block_cache, basepath, assets).render(write)
+    write("</div>")
+
 def extract_title(markdown: str) -> str:
     """
         Extracts the title from the markdown string. The title is the first line of the markdown.
     """
 
-    md_split = markdown.split("\n")
+    return extract_title_from_lines(markdown.split("\n"))
 
-    for line in md_split:
+def extract_title_from_lines(lines) -> str:
+    """
+        extract_title over an iterable of lines, such as an open file. Stops reading at the title.
+    """
+    for line in lines:
         if line.startswith("# "): 
             return line[2:].strip()
         
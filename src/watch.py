@@ -0,0 +1,203 @@
+import os
+import time
+
+from block_cache import BlockCache
+from build_manifest import BuildManifest, hash_file
+from build_plan import is_page
+from dependency_graph import page_inputs
+from copy_static_content import load_asset_urls, remove_file_and_empty_dirs, sync_static_content, walk_tree
+from generate_page import generate_page, generate_pages_recursive, page_dest_path, remove_stale_output
+from page_template import PageTemplate
+from precompress import DEFAULT_MIN_SIZE, precompress_outputs
+
+def snapshot(root: str) -> dict:
+    """
+        Maps the relative path of every file under root to its (mtime_ns, size). Uses scandir, so each
+        entry costs a single stat.
+    """
+    files = {}
+    if not os.path.isdir(root):
+        return files
+
+    for rel_path, entry in walk_tree(root):
+        if not entry.is_dir():
+            stat = entry.stat()
+            files[rel_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def diff_snapshots(old: dict, new: dict) -> tuple:
+    # returns (changed or added, removed) relative paths
+    changed = [rel_path for rel_path, stat in new.items() if old.get(rel_path) != stat]
+    removed = [rel_path for rel_path in old if rel_path not in new]
+    return changed, removed
+
+
+class SiteWatcher():
+    """
+        Polls content/, static/ and the template for changes and rebuilds only what they affect.
+        The compiled template, the manifest and the block cache stay loaded between rebuilds. With a
+        manifest, a changed static asset also rebuilds the pages that reference it. With an
+        asset_manifest_path, static files are fingerprinted as in a regular build, and with minify pages
+        are minified. check_hash and link are passed on to sync_static_content, as in a regular build.
+        With a gzip_manifest_path, the .gz siblings of everything a rebuild touched are refreshed too.
+    """
+
+    def __init__(self, basepath: str, content_dir: str, static_dir: str, template_path: str, dest_dir: str,
+                 manifest_path: str = None, static_manifest_path: str = None, block_cache_path: str = None,
+                 jobs: int = 1, interval: float = 0.1, asset_manifest_path: str = None, minify: bool = False,
+                 check_hash: bool = False, link: bool = False, gzip_manifest_path: str = None, gzip_min_size: int = DEFAULT_MIN_SIZE):
+        self.basepath = basepath
+        self.content_dir = os.path.abspath(content_dir)
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = os.path.abspath(dest_dir)
+        self.manifest_path = manifest_path
+        self.static_manifest_path = static_manifest_path
+        self.block_cache_path = block_cache_path
+        self.jobs = jobs
+        self.interval = interval
+        self.asset_manifest_path = asset_manifest_path
+        self.minify = minify
+        self.check_hash = check_hash
+        self.link = link
+        self.gzip_manifest_path = gzip_manifest_path
+        self.gzip_min_size = gzip_min_size
+
+        self.assets = load_asset_urls(asset_manifest_path) if asset_manifest_path is not None else None
+        self.template = PageTemplate.load(template_path, basepath, self.assets, minify)
+        self.manifest = BuildManifest.load(manifest_path) if manifest_path is not None else None
+        self.block_cache = BlockCache(block_cache_path, context=self.template.url_context) if block_cache_path is not None else None
+
+        self.content_snapshot = snapshot(self.content_dir)
+        self.static_snapshot = snapshot(self.static_dir)
+        self.template_stat = self._template_stat()
+
+    def _template_stat(self) -> tuple:
+        stat = os.stat(self.template_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self) -> bool:
+        """
+            Checks for changes once and rebuilds whatever they affect. Returns True if anything changed.
+        """
+        content_snapshot = snapshot(self.content_dir)
+        static_snapshot = snapshot(self.static_dir)
+        template_stat = self._template_stat()
+
+        content_changed, content_removed = diff_snapshots(self.content_snapshot, content_snapshot)
+        static_changed, static_removed = diff_snapshots(self.static_snapshot, static_snapshot)
+        template_changed = template_stat != self.template_stat
+
+        self.content_snapshot = content_snapshot
+        self.static_snapshot = static_snapshot
+        self.template_stat = template_stat
+
+        if not (content_changed or content_removed or static_changed or static_removed or template_changed):
+            return False
+
+        start = time.perf_counter()
+        try:
+            assets = 0
+            if static_changed or static_removed:
+                assets = len(sync_static_content(self.static_dir, self.dest_dir, manifest_path=self.static_manifest_path,
+                                                 check_hash=self.check_hash, link=self.link, asset_manifest_path=self.asset_manifest_path))
+                # pages pick up new fingerprints through the template, and a new fingerprint for something
+                # the template itself links to (the stylesheet) affects every page
+                if self.asset_manifest_path is not None:
+                    self.assets = load_asset_urls(self.asset_manifest_path)
+                    old_digest = self.template.digest
+                    self.load_template()
+                    template_changed = template_changed or self.template.digest != old_digest
+
+            if template_changed:
+                pages = self.rebuild_all_pages()
+            else:
+                if static_changed or static_removed:
+                    content_changed = content_changed + [rel_source for rel_source in self.asset_dependents() if rel_source not in content_changed]
+                pages = self.rebuild_pages(content_changed, content_removed)
+
+            # a server that prefers .gz siblings would otherwise keep sending the old pages
+            if self.gzip_manifest_path is not None:
+                precompress_outputs(self.dest_dir, manifest_path=self.gzip_manifest_path, min_size=self.gzip_min_size)
+        except Exception as e:
+            # keep watching, the next save will probably fix it
+            print(f"Rebuild failed: {e}")
+            return True
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {pages} page(s) and {assets} asset(s) in {elapsed_ms:.1f} ms")
+        return True
+
+    def load_template(self) -> None:
+        self.template = PageTemplate.load(self.template_path, self.basepath, self.assets, self.minify)
+        # cached blocks carry the asset names in their urls
+        if self.block_cache is not None:
+            self.block_cache.context = self.template.url_context
+
+    def rebuild_all_pages(self) -> int:
+        self.load_template()
+        generate_pages_recursive(basepath=self.basepath, dir_path_content=self.content_dir, template_path=self.template_path,
+                                 dest_dir_path=self.dest_dir, manifest_path=self.manifest_path, jobs=self.jobs,
+                                 block_cache_path=self.block_cache_path, static_dir=self.static_dir, assets=self.assets,
+                                 minify=self.minify)
+        if self.manifest_path is not None:
+            self.manifest = BuildManifest.load(self.manifest_path)
+        return len([rel_path for rel_path in self.content_snapshot if is_page(rel_path)])
+
+    def asset_dependents(self) -> list:
+        # the sources of the pages that reference a static asset which changed since the last build
+        if self.manifest is None:
+            return []
+        dirty_outputs = self.manifest.graph.dirty_outputs(self.manifest.refresh_assets(self.static_dir))
+        return sorted(rel_source for rel_source, entry in self.manifest.pages.items() if entry["output"] in dirty_outputs)
+
+    def rebuild_pages(self, changed: list, removed: list) -> int:
+        pages = 0
+        for rel_source in changed:
+            if not is_page(rel_source):
+                continue
+
+            src_item_path = os.path.join(self.content_dir, rel_source)
+            dest_item_path = page_dest_path(src_item_path, self.content_dir, self.dest_dir)
+            references, _ = generate_page(basepath=self.basepath, from_path=src_item_path, template_path=self.template_path,
+                                          dest_path=dest_item_path, template=self.template, block_cache=self.block_cache)
+            pages += 1
+
+            if self.manifest is not None:
+                rel_output = os.path.relpath(dest_item_path, self.dest_dir)
+                self.manifest.pages[rel_source] = BuildManifest.page_entry(hash_file(src_item_path), os.stat(src_item_path), rel_output)
+                self.manifest.graph.set_dependencies(rel_output, page_inputs(rel_source, references, self.static_dir))
+
+        for rel_source in removed:
+            if not is_page(rel_source):
+                continue
+
+            if self.manifest is not None and rel_source in self.manifest.pages:
+                rel_output = self.manifest.pages.pop(rel_source)["output"]
+                remove_stale_output(self.dest_dir, rel_output)
+                self.manifest.graph.remove_output(rel_output)
+            else:
+                dest_item_path = page_dest_path(os.path.join(self.content_dir, rel_source), self.content_dir, self.dest_dir)
+                remove_file_and_empty_dirs(self.dest_dir, os.path.relpath(dest_item_path, self.dest_dir))
+
+        if self.manifest is not None:
+            self.manifest.refresh_assets(self.static_dir)
+            self.manifest.save()
+        return pages
+
+    def run(self) -> None:
+        print(f"Watching {self.content_dir}, {os.path.abspath(self.static_dir)} and {self.template_path} for changes (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self.block_cache is not None:
+            self.block_cache.close()
+            self.block_cache = None